@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from controllers.section_controller import section_controller
 import logging
 
@@ -7,9 +7,9 @@ logger = logging.getLogger(__name__)
 
 class AIController:
 
-    def auto_populate(
+    async def auto_populate(
         self,
-        db: Session,
+        db: AsyncSession,
         section_id: str,
         brief_id: str
     ):
@@ -18,7 +18,7 @@ class AIController:
         """
 
         try:
-            return section_controller.auto_populate_from_document(
+            return await section_controller.auto_populate_from_document(
                 db=db,
                 section_id=section_id,
                 brief_id=brief_id
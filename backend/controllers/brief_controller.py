@@ -1,212 +1,615 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from models import Brief, BriefSection, BriefVersion, BriefStatus
-from schemas import BriefCreate, BriefUpdate, BriefResponse
+from sqlalchemy import select, update, tuple_, func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+from starlette.concurrency import run_in_threadpool
+from typing import BinaryIO, Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from models import Brief, BriefSection, BriefVersion, BriefStatus, Document
+from schemas import BriefCreate, BriefUpdate, BriefResponse, SectionResponse, DocumentMetadataResponse
 from services.cache_service import cache_service
-from services.export_service import export_service
+from services.export_service import export_service, EXPORT_LAYOUT_VERSION
+from services.schema_service import schema_service
+from services.export_cache_service import export_cache_service, EXPORT_EXTENSIONS
+from services.bulk_export_service import bulk_export_service, BulkExportJob
+from services.version_service import version_service
+from services.autosave_service import autosave_service
+from controllers.section_controller import section_controller
 import logging
 import json
+import base64
+import hashlib
+import uuid
+import os
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on briefs packed into one bulk export
+BULK_EXPORT_MAX = int(os.getenv("BULK_EXPORT_MAX", "500"))
+
+VERSION_CREATE_ATTEMPTS = 3
+
+
+class StaleWriteError(Exception):
+    """A conditional write found the row at a different version (If-Match mismatch)"""
+
+
+class VersionConflictError(Exception):
+    """No free version number could be taken for a brief"""
+
+
 class BriefController:
-    
-    def create_brief(self, db: Session, brief_data: BriefCreate) -> Brief:
-        """Create a new brief"""
+
+    async def create_brief(self, db: AsyncSession, brief_data: BriefCreate) -> Brief:
+        """Create a new brief with its sections"""
+        briefs = await self.create_briefs(db, [brief_data])
+        return briefs[0]
+
+    async def create_briefs(self, db: AsyncSession, briefs_data: List[BriefCreate]) -> List[Brief]:
+        """Create briefs and their sections in a single transaction"""
         try:
-            brief = Brief(
-                title=brief_data.title,
-                event_type=brief_data.event_type,
-                brief_metadata=brief_data.brief_metadata or {}
-            )
-            db.add(brief)
-            db.commit()
-            db.refresh(brief)
-            
-            # Clear cache
-            cache_service.clear_pattern("briefs:*")
-            
-            logger.info(f"Created brief: {brief.id}")
-            return brief
+            briefs = [
+                Brief(
+                    id=str(uuid.uuid4()),
+                    title=brief_data.title,
+                    event_type=brief_data.event_type,
+                    brief_metadata=brief_data.brief_metadata or {}
+                )
+                for brief_data in briefs_data
+            ]
+            db.add_all(briefs)
+            await db.flush()
+
+            await section_controller.initialize_sections(db, [b.id for b in briefs])
+            await db.commit()
+
+            # Clear cached listings only
+            await cache_service.clear_namespace("briefs:list")
+
+            logger.info(f"Created {len(briefs)} brief(s)")
+            return briefs
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error creating brief: {str(e)}")
+            await db.rollback()
+            logger.error(f"Error creating briefs: {str(e)}")
             raise
-    
-    def get_brief(self, db: Session, brief_id: str) -> Optional[Brief]:
-        """Get a brief by ID with caching"""
+
+    async def get_brief(self, db: AsyncSession, brief_id: str) -> Optional[dict]:
+        """Get a serialized brief by ID (read-through cache)"""
         cache_key = f"briefs:{brief_id}"
-        
-        # Try cache first
-        cached = cache_service.get(cache_key)
+
+        # Serve straight from cache without touching the database
+        cached = await cache_service.get(cache_key)
         if cached:
-            # Return from database to get relationships
-            return db.query(Brief).filter(Brief.id == brief_id).first()
-        
-        brief = db.query(Brief).filter(Brief.id == brief_id).first()
-        
-        if brief:
-            # Cache for 1 hour
-            cache_service.set(cache_key, {"id": brief.id}, ttl=3600)
-        
-        return brief
-    
-    def get_all_briefs(self, db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[Brief]:
-        """Get all briefs with optional status filter"""
-        query = db.query(Brief)
-        
+            return cached
+
+        brief = await db.get(Brief, brief_id)
+
+        if not brief:
+            return None
+
+        payload = BriefResponse.model_validate(brief).model_dump(mode="json")
+
+        # Cache for 1 hour; writes invalidate explicitly
+        await cache_service.set(cache_key, payload, ttl=3600)
+
+        return payload
+
+    async def get_brief_full(self, db: AsyncSession, brief_id: str) -> Optional[dict]:
+        """
+        Brief, ordered sections, document metadata and latest version
+        number in three queries, cached as one unit. Every write to the
+        brief, its sections or its documents drops the entry.
+        """
+        cache_key = f"briefs:{brief_id}:full"
+
+        payload = await cache_service.get(cache_key)
+        if not payload:
+            latest_version = (
+                select(func.max(BriefVersion.version_number))
+                .where(BriefVersion.brief_id == Brief.id)
+                .correlate(Brief)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                select(Brief, latest_version)
+                .where(Brief.id == brief_id)
+                .options(
+                    selectinload(Brief.sections),
+                    # Extracted text can be large and isn't needed to list documents
+                    selectinload(Brief.documents).load_only(
+                        *(getattr(Document, name) for name in DocumentMetadataResponse.model_fields)
+                    ),
+                )
+            )
+            row = result.first()
+
+            if not row:
+                return None
+
+            brief, latest = row
+            payload = {
+                **BriefResponse.model_validate(brief).model_dump(mode="json"),
+                "latest_version": latest,
+                "sections": [
+                    SectionResponse.model_validate(s).model_dump(mode="json")
+                    for s in sorted(brief.sections, key=lambda s: s.section_number)
+                ],
+                "documents": [
+                    DocumentMetadataResponse.model_validate(d).model_dump(mode="json")
+                    for d in sorted(brief.documents, key=lambda d: d.uploaded_at, reverse=True)
+                ],
+            }
+            await cache_service.set(cache_key, payload, ttl=3600)
+
+        # Not cached: buffered edits change far more often than the rest
+        return {**payload, "sections": await section_controller.with_pending(brief_id, payload["sections"])}
+
+    async def get_brief_state(self, db: AsyncSession, brief_id: str) -> Optional[Tuple[int, datetime]]:
+        """(row_version, updated_at) without loading the brief; None if it doesn't exist"""
+        result = await db.execute(
+            select(Brief.row_version, Brief.updated_at).where(Brief.id == brief_id)
+        )
+        return result.first()
+
+    @staticmethod
+    def encode_cursor(updated_at: datetime, brief_id: str) -> str:
+        raw = json.dumps([updated_at.isoformat(), brief_id])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            updated_at, brief_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(updated_at), brief_id
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    async def get_all_briefs(self, db: AsyncSession, status: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> dict:
+        """Get a page of briefs, newest first, with optional status filter.
+
+        Pages are keyed on (updated_at, id) so every page is an index
+        range scan regardless of depth.
+        """
+        cache_key = await cache_service.namespace_key("briefs:list", f"{status or 'all'}:{cursor or ''}:{limit}")
+
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            return cached
+
+        query = select(Brief)
+
         if status:
-            query = query.filter(Brief.status == status)
-        
-        briefs = query.order_by(Brief.updated_at.desc()).offset(skip).limit(limit).all()
-        return briefs
-    
-    def update_brief(self, db: Session, brief_id: str, brief_data: BriefUpdate) -> Optional[Brief]:
-        """Update a brief"""
+            try:
+                query = query.where(Brief.status == BriefStatus(status))
+            except ValueError:
+                raise ValueError(f"Invalid status: {status}")
+
+        if cursor:
+            query = query.where(tuple_(Brief.updated_at, Brief.id) < tuple_(*self.decode_cursor(cursor)))
+
+        result = await db.execute(
+            query.order_by(Brief.updated_at.desc(), Brief.id.desc()).limit(limit + 1)
+        )
+        rows = result.scalars().all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1].updated_at, rows[-1].id)
+
+        page = {
+            "items": [BriefResponse.model_validate(b).model_dump(mode="json") for b in rows],
+            "next_cursor": next_cursor,
+        }
+
+        # Listings change on every write, keep them short-lived
+        await cache_service.set(cache_key, page, ttl=60)
+
+        return page
+
+    async def update_brief(
+        self,
+        db: AsyncSession,
+        brief_id: str,
+        brief_data: BriefUpdate,
+        expected_version: Optional[int] = None,
+    ) -> Optional[Brief]:
+        """
+        Update a brief. With `expected_version` (If-Match) the write only
+        happens if the brief is still at that row version.
+        """
         try:
-            brief = db.query(Brief).filter(Brief.id == brief_id).first()
-            
-            if not brief:
-                return None
-            
-            # Update fields
+            values: Dict[str, Any] = {"row_version": Brief.row_version + 1}
             if brief_data.title is not None:
-                brief.title = brief_data.title
+                values["title"] = brief_data.title
             if brief_data.event_type is not None:
-                brief.event_type = brief_data.event_type
+                values["event_type"] = brief_data.event_type
             if brief_data.status is not None:
-                brief.status = brief_data.status
+                values["status"] = BriefStatus(brief_data.status.value)
             if brief_data.brief_metadata is not None:
-                brief.brief_metadata = brief_data.brief_metadata
-            
-            db.commit()
-            db.refresh(brief)
-            
+                values["brief_metadata"] = brief_data.brief_metadata
+
+            stmt = update(Brief).where(Brief.id == brief_id)
+            if expected_version is not None:
+                stmt = stmt.where(Brief.row_version == expected_version)
+
+            result = await db.execute(
+                stmt.values(**values)
+                .returning(Brief)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            brief = result.scalar_one_or_none()
+
+            if brief is None:
+                await db.rollback()
+                if expected_version is not None and await db.get(Brief, brief_id):
+                    raise StaleWriteError(f"Brief {brief_id} was modified since it was read")
+                return None
+
+            await db.commit()
+
             # Clear cache
-            cache_service.delete(f"briefs:{brief_id}")
-            cache_service.clear_pattern("briefs:list:*")
-            
+            await cache_service.delete(f"briefs:{brief_id}")
+            await cache_service.delete(f"briefs:{brief_id}:full")
+            await cache_service.clear_namespace("briefs:list")
+
             logger.info(f"Updated brief: {brief_id}")
             return brief
+        except StaleWriteError:
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating brief: {str(e)}")
             raise
-    
-    def delete_brief(self, db: Session, brief_id: str) -> bool:
+
+    async def delete_brief(self, db: AsyncSession, brief_id: str) -> bool:
         """Delete a brief"""
         try:
-            brief = db.query(Brief).filter(Brief.id == brief_id).first()
-            
+            brief = await db.get(Brief, brief_id)
+
             if not brief:
                 return False
-            
-            db.delete(brief)
-            db.commit()
-            
+
+            await db.delete(brief)
+            await db.commit()
+
             # Clear cache
-            cache_service.delete(f"briefs:{brief_id}")
-            cache_service.clear_pattern("briefs:list:*")
-            
+            await cache_service.delete(f"briefs:{brief_id}")
+            await cache_service.delete(f"briefs:{brief_id}:full")
+            await cache_service.delete(f"sections:brief:{brief_id}")
+            await cache_service.clear_namespace("briefs:list")
+            await cache_service.clear_namespace(f"versions:{brief_id}")
+            export_cache_service.invalidate(brief_id)
+            await autosave_service.discard_brief(brief_id)
+
             logger.info(f"Deleted brief: {brief_id}")
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting brief: {str(e)}")
             raise
-    
-    def create_version(self, db: Session, brief_id: str) -> Optional[BriefVersion]:
-        """Create a new version snapshot of a brief"""
-        try:
-            brief = db.query(Brief).filter(Brief.id == brief_id).first()
-            
-            if not brief:
-                return None
-            
-            # Get all sections
-            sections = db.query(BriefSection).filter(BriefSection.brief_id == brief_id).all()
-            
-            # Create snapshot
-            snapshot = {
-                "title": brief.title,
-                "event_type": brief.event_type,
-                "status": brief.status.value,
-                "brief_metadata": brief.brief_metadata,
-                "sections": [
-                    {
-                        "section_number": s.section_number,
-                        "section_name": s.section_name,
-                        "content": s.content,
-                        "ai_generated": s.ai_generated
-                    }
-                    for s in sections
-                ]
-            }
-            
-            # Increment version
-            brief.version += 1
-            
+
+    async def create_version(self, db: AsyncSession, brief_id: str) -> Optional[BriefVersion]:
+        """Create a new version of a brief (a delta, or a checkpoint every N versions)"""
+        await autosave_service.flush_brief(brief_id)
+
+        for attempt in range(1, VERSION_CREATE_ATTEMPTS + 1):
+            try:
+                return await self._create_version(db, brief_id)
+            except IntegrityError as e:
+                # (brief_id, version_number) is unique; the retry numbers past the clash
+                await db.rollback()
+                if attempt == VERSION_CREATE_ATTEMPTS:
+                    logger.error(f"Could not create version for brief {brief_id}: {e.orig}")
+                    raise VersionConflictError(f"Could not take a version number for brief {brief_id}")
+                logger.warning(f"Version insert failed for brief {brief_id}, retrying: {e.orig}")
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Error creating version: {str(e)}")
+                raise
+
+    async def _create_version(self, db: AsyncSession, brief_id: str) -> Optional[BriefVersion]:
+        # Take the next number atomically; the row lock also orders concurrent saves.
+        # Never below a stored version: a counter left behind would clash forever.
+        stored = (
+            select(func.coalesce(func.max(BriefVersion.version_number), 0))
+            .where(BriefVersion.brief_id == brief_id)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(Brief)
+            .where(Brief.id == brief_id)
+            .values(
+                version=case((Brief.version >= stored, Brief.version), else_=stored) + 1,
+                row_version=Brief.row_version + 1,
+            )
+            .returning(Brief.version, Brief.title, Brief.event_type, Brief.status, Brief.brief_metadata)
+            .execution_options(synchronize_session=False)
+        )
+        brief = result.first()
+
+        if not brief:
+            await db.rollback()
+            return None
+
+        # Get all sections
+        result = await db.execute(
+            select(BriefSection).where(BriefSection.brief_id == brief_id).order_by(BriefSection.section_number)
+        )
+        sections = result.scalars().all()
+
+        # Create snapshot
+        snapshot = {
+            "title": brief.title,
+            "event_type": brief.event_type,
+            "status": brief.status.value,
+            "brief_metadata": brief.brief_metadata,
+            "sections": [
+                {
+                    "section_number": s.section_number,
+                    "section_name": s.section_name,
+                    "content": s.content,
+                    "ai_generated": s.ai_generated
+                }
+                for s in sections
+            ]
+        }
+
+        previous = await self.get_version(db, brief_id, brief.version - 1)
+
+        if version_service.is_checkpoint(brief.version, previous is not None):
             version = BriefVersion(
                 brief_id=brief_id,
                 version_number=brief.version,
+                is_checkpoint=True,
                 content_snapshot=snapshot
             )
-            
-            db.add(version)
-            db.commit()
-            db.refresh(version)
-            
-            logger.info(f"Created version {version.version_number} for brief: {brief_id}")
-            return version
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error creating version: {str(e)}")
-            raise
-    
-    def get_versions(self, db: Session, brief_id: str) -> List[BriefVersion]:
-        """Get all versions of a brief"""
-        return db.query(BriefVersion).filter(BriefVersion.brief_id == brief_id).order_by(BriefVersion.version_number.desc()).all()
-    
-    def export_brief(self, db: Session, brief_id: str, format: str = "pdf") -> Optional[str]:
-        """Export brief to PDF or Word"""
+        else:
+            version = BriefVersion(
+                brief_id=brief_id,
+                version_number=brief.version,
+                is_checkpoint=False,
+                delta=version_service.compute_delta(previous["content_snapshot"], snapshot)
+            )
+
+        db.add(version)
+        await db.commit()
+
+        # Version number changed
+        await cache_service.delete(f"briefs:{brief_id}")
+        await cache_service.delete(f"briefs:{brief_id}:full")
+        await cache_service.clear_namespace("briefs:list")
+
+        # The next save diffs against this version; spare it the replay
+        await cache_service.set(
+            await cache_service.namespace_key(f"versions:{brief_id}", str(version.version_number)),
+            self._version_payload(version, snapshot),
+            ttl=3600,
+        )
+
+        logger.info(f"Created version {version.version_number} for brief: {brief_id}")
+        return version
+
+    async def get_versions(self, db: AsyncSession, brief_id: str) -> List[BriefVersion]:
+        """Get all versions of a brief (metadata only, no snapshot bodies)"""
+        result = await db.execute(
+            select(BriefVersion)
+            .options(load_only(
+                BriefVersion.id,
+                BriefVersion.version_number,
+                BriefVersion.is_checkpoint,
+                BriefVersion.created_at,
+            ))
+            .where(BriefVersion.brief_id == brief_id)
+            .order_by(BriefVersion.version_number.desc())
+        )
+        return result.scalars().all()
+
+    async def get_version(self, db: AsyncSession, brief_id: str, version_number: int) -> Optional[dict]:
+        """Reconstruct one version from its nearest checkpoint plus the deltas after it"""
+        # Versions are immutable; the namespace only goes when the brief is deleted
+        cache_key = await cache_service.namespace_key(f"versions:{brief_id}", str(version_number))
+
+        cached = await cache_service.get(cache_key)
+        if cached:
+            return cached
+
+        # Rows that predate delta storage have no flag and hold full snapshots
+        checkpoint = (
+            select(func.max(BriefVersion.version_number))
+            .where(
+                BriefVersion.brief_id == brief_id,
+                BriefVersion.version_number <= version_number,
+                BriefVersion.is_checkpoint.isnot(False),
+            )
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(BriefVersion)
+            .where(
+                BriefVersion.brief_id == brief_id,
+                BriefVersion.version_number >= checkpoint,
+                BriefVersion.version_number <= version_number,
+            )
+            .order_by(BriefVersion.version_number)
+        )
+        chain = result.scalars().all()
+
+        if not chain or chain[-1].version_number != version_number:
+            return None
+
+        snapshot = version_service.reconstruct(
+            chain[0].content_snapshot,
+            [v.delta for v in chain[1:]],
+        )
+        payload = self._version_payload(chain[-1], snapshot)
+
+        await cache_service.set(cache_key, payload, ttl=3600)
+        return payload
+
+    async def diff_versions(self, db: AsyncSession, brief_id: str, from_version: int, to_version: int) -> Optional[dict]:
+        """Field-level changes between two versions (cached per version pair)"""
+        cache_key = await cache_service.namespace_key(f"versions:{brief_id}", f"diff:{from_version}:{to_version}")
+
+        cached = await cache_service.get(cache_key)
+        if cached:
+            return cached
+
+        old = await self.get_version(db, brief_id, from_version)
+        new = await self.get_version(db, brief_id, to_version)
+
+        if not old or not new:
+            return None
+
+        payload = {
+            "from_version": from_version,
+            "to_version": to_version,
+            **version_service.diff(old["content_snapshot"], new["content_snapshot"]),
+        }
+
+        await cache_service.set(cache_key, payload, ttl=3600)
+        return payload
+
+    @staticmethod
+    def _version_payload(version: BriefVersion, snapshot: dict) -> dict:
+        return {
+            "id": version.id,
+            "version_number": version.version_number,
+            "created_at": version.created_at.isoformat(),
+            "content_snapshot": snapshot,
+        }
+
+    async def export_fingerprint(self, db: AsyncSession, brief_id: str) -> Optional[str]:
+        """
+        Cheap content fingerprint: changes whenever the brief or any section
+        is written, and with the renderer version and the schema (headings)
+        """
+        result = await db.execute(
+            select(
+                Brief.version,
+                Brief.updated_at,
+                func.max(BriefSection.updated_at),
+                func.count(BriefSection.id),
+            )
+            .outerjoin(BriefSection, BriefSection.brief_id == Brief.id)
+            .where(Brief.id == brief_id)
+            .group_by(Brief.id, Brief.version, Brief.updated_at)
+        )
+        row = result.first()
+
+        if not row:
+            return None
+
+        key = (EXPORT_LAYOUT_VERSION, schema_service.etag, *row)
+        return hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+
+    async def export_brief(self, db: AsyncSession, brief_id: str, format: str = "pdf") -> Optional[BinaryIO]:
+        """
+        Export brief to PDF or Word as an open, rewound file object.
+        Reuses the cached render when unchanged; the caller closes it.
+        """
         try:
-            brief = db.query(Brief).filter(Brief.id == brief_id).first()
-            
-            if not brief:
+            if format not in EXPORT_EXTENSIONS:
+                raise ValueError(f"Unsupported format: {format}")
+
+            await autosave_service.flush_brief(brief_id)
+            fingerprint = await self.export_fingerprint(db, brief_id)
+
+            if not fingerprint:
                 return None
-            
+
+            cached_path = export_cache_service.get(brief_id, fingerprint, format)
+            if cached_path:
+                return open(cached_path, "rb")
+
+            brief = await db.get(Brief, brief_id)
+
             # Get all sections
-            sections = db.query(BriefSection).filter(BriefSection.brief_id == brief_id).order_by(BriefSection.section_number).all()
-            
-            # Prepare data
-            brief_data = {
-                "id": brief.id,
-                "title": brief.title,
-                "event_type": brief.event_type,
-                "status": brief.status.value,
-                "version": brief.version,
-                "created_at": brief.created_at.strftime("%Y-%m-%d %H:%M"),
-                "sections": [
-                    {
-                        "section_number": s.section_number,
-                        "section_name": s.section_name,
-                        "content": s.content
-                    }
-                    for s in sections
-                ]
-            }
-            
-            if format == "pdf":
-                file_path = export_service.export_to_pdf(brief_data)
-            elif format == "word":
-                file_path = export_service.export_to_word(brief_data)
-            else:
-                raise ValueError(f"Unsupported format: {format}")
-            
-            return file_path
+            result = await db.execute(
+                select(BriefSection).where(BriefSection.brief_id == brief_id).order_by(BriefSection.section_number)
+            )
+            sections = result.scalars().all()
+
+            brief_data = self._export_data(brief, sections)
+
+            # Rendering is CPU-bound; keep it off the event loop
+            return await run_in_threadpool(self._render_export, brief_data, fingerprint, format)
         except Exception as e:
             logger.error(f"Error exporting brief: {str(e)}")
             raise
 
+    @staticmethod
+    def _export_data(brief: Brief, sections: List[BriefSection]) -> Dict[str, Any]:
+        return {
+            "id": brief.id,
+            "title": brief.title,
+            "event_type": brief.event_type,
+            "status": brief.status.value,
+            "version": brief.version,
+            "created_at": brief.created_at.strftime("%Y-%m-%d %H:%M"),
+            "sections": [
+                {
+                    "section_number": s.section_number,
+                    "section_name": s.section_name,
+                    "content": s.content
+                }
+                for s in sections
+            ]
+        }
+
+    async def export_briefs(
+        self,
+        db: AsyncSession,
+        brief_ids: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        format: str = "pdf",
+    ) -> Optional[BulkExportJob]:
+        """Start a background ZIP export of the selected briefs"""
+        if format not in EXPORT_EXTENSIONS:
+            raise ValueError(f"Unsupported format: {format}")
+        if not brief_ids and not status:
+            raise ValueError("Provide brief_ids or status")
+
+        if brief_ids:
+            for brief_id in brief_ids:
+                await autosave_service.flush_brief(brief_id)
+        else:
+            await autosave_service.flush_all()
+
+        # Briefs plus all their sections in one batched round trip
+        query = select(Brief).options(selectinload(Brief.sections))
+
+        if brief_ids:
+            query = query.where(Brief.id.in_(brief_ids))
+        if status:
+            query = query.where(Brief.status == BriefStatus(status))
+
+        result = await db.execute(
+            query.order_by(Brief.updated_at.desc(), Brief.id.desc()).limit(BULK_EXPORT_MAX + 1)
+        )
+        briefs = result.scalars().all()
+
+        if not briefs:
+            return None
+        if len(briefs) > BULK_EXPORT_MAX:
+            raise ValueError(f"Bulk export is limited to {BULK_EXPORT_MAX} briefs")
+
+        payloads = [
+            self._export_data(brief, sorted(brief.sections, key=lambda s: s.section_number))
+            for brief in briefs
+        ]
+        return await bulk_export_service.submit(payloads, format)
+
+    @staticmethod
+    def _render_export(brief_data: Dict[str, Any], fingerprint: str, format: str) -> BinaryIO:
+        if format == "pdf":
+            output = export_service.export_to_pdf(brief_data)
+        else:
+            output = export_service.export_to_word(brief_data)
+
+        if export_cache_service.enabled:
+            export_cache_service.put(brief_data["id"], fingerprint, format, output)
+        return output
+
 # Singleton instance
 brief_controller = BriefController()
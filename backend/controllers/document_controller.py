@@ -1,6 +1,10 @@
-from sqlalchemy.orm import Session
-from models import Document, Brief
-from services.document_service import document_service
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator
+from models import Document, Brief, ExtractionStatus
+from services.document_service import document_service, EXTRACTABLE_TYPES
+from services.extraction_service import extraction_service
+from services.cache_service import cache_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,70 +14,136 @@ class DocumentController:
 
     async def upload_document(
         self,
-        db: Session,
+        db: AsyncSession,
         brief_id: str,
         filename: str,
-        file_content: bytes,
+        chunks: AsyncIterator[bytes],
     ) -> Document:
 
-        brief = db.query(Brief).filter(Brief.id == brief_id).first()
+        brief = await db.get(Brief, brief_id)
         if not brief:
             raise ValueError("Brief not found")
 
-        file_path, mime_type = await document_service.save_file(
-            file_content, filename
-        )
+        saved = await document_service.save_upload(chunks, filename)
 
         file_type = filename.rsplit(".", 1)[-1].lower()
-
-        extracted = await document_service.extract_text_content(
-            file_path, file_type
+        extractable = file_type in EXTRACTABLE_TYPES
+
+        try:
+            # Same bytes were parsed before: reuse the result
+            reused = None
+            if extractable and saved.deduplicated:
+                reused = await self._find_extraction(db, saved.sha256, file_type)
+
+            document = Document(
+                brief_id=brief_id,
+                filename=filename,
+                file_path=saved.path,
+                file_type=file_type,
+                mime_type=saved.mime_type,
+                file_size=saved.size,
+                file_hash=saved.sha256,
+                extracted_content=reused.extracted_content if reused else None,
+                extraction_status=(
+                    ExtractionStatus.PENDING.value
+                    if extractable and not reused
+                    else ExtractionStatus.COMPLETED.value
+                ),
+            )
+
+            db.add(document)
+            await db.commit()
+            await db.refresh(document)
+        except BaseException:
+            document_service.discard(saved)
+            raise
+
+        # Only once the row is committed: a concurrent delete of the same
+        # bytes has then either counted it or already moved its file aside
+        document_service.store(saved)
+        await cache_service.delete(f"briefs:{brief_id}:full")
+
+        # Parse in the background; clients poll the document for completion
+        if extractable and not reused:
+            extraction_service.submit(document.id, document.file_path, file_type)
+
+        logger.info(
+            f"Uploaded document {document.id}"
+            + (" (deduplicated)" if saved.deduplicated else "")
         )
+        return document
 
-        document = Document(
-            brief_id=brief_id,
-            filename=filename,
-            file_path=file_path,
-            file_type=file_type,
-            mime_type=mime_type,
-            extracted_content=extracted,
+    async def _find_extraction(self, db: AsyncSession, file_hash: str, file_type: str):
+        result = await db.execute(
+            select(Document)
+            .where(
+                Document.file_hash == file_hash,
+                Document.file_type == file_type,
+                Document.extraction_status == ExtractionStatus.COMPLETED.value,
+            )
+            .limit(1)
         )
+        return result.scalars().first()
 
-        db.add(document)
-        db.commit()
-        db.refresh(document)
-
-        logger.info(f"Uploaded document {document.id}")
-        return document
-
-    def get_brief_documents(self, db: Session, brief_id: str):
-        return (
-            db.query(Document)
-            .filter(Document.brief_id == brief_id)
+    async def get_brief_documents(self, db: AsyncSession, brief_id: str):
+        result = await db.execute(
+            select(Document)
+            .where(Document.brief_id == brief_id)
             .order_by(Document.uploaded_at.desc())
-            .all()
         )
-
-    def get_document(self, db: Session, document_id: str):
-        return (
-            db.query(Document)
-            .filter(Document.id == document_id)
-            .first()
+        return result.scalars().all()
+
+    async def get_documents_state(self, db: AsyncSession, brief_id: str):
+        """(count, last change) of a brief's documents without loading them"""
+        result = await db.execute(
+            select(
+                func.count(),
+                # Rows from before updated_at existed have only uploaded_at
+                func.max(func.coalesce(Document.updated_at, Document.uploaded_at)),
+            ).where(Document.brief_id == brief_id)
         )
+        return tuple(result.one())
 
-    def delete_document(self, db: Session, document_id: str) -> bool:
-        document = (
-            db.query(Document)
-            .filter(Document.id == document_id)
-            .first()
-        )
+    @staticmethod
+    def documents_state(documents) -> tuple:
+        """get_documents_state() of already loaded documents"""
+        if not documents:
+            return 0, None
+        return len(documents), max(d.updated_at or d.uploaded_at for d in documents)
+
+    async def get_document(self, db: AsyncSession, document_id: str):
+        return await db.get(Document, document_id)
+
+    async def delete_document(self, db: AsyncSession, document_id: str) -> bool:
+        document = await db.get(Document, document_id)
 
         if not document:
             return False
 
-        document_service.delete_file(document.file_path)
-        db.delete(document)
-        db.commit()
+        await db.delete(document)
+        await db.commit()
+        await cache_service.delete(f"briefs:{document.brief_id}:full")
+
+        if not document.file_hash:
+            document_service.delete_file(document.file_path)
+        else:
+            # Stored files are shared by every document with the same bytes.
+            # Move the file aside before counting: an upload committed after
+            # the count finds it gone and stores its own copy.
+            retired = document_service.retire_file(document.file_path)
+            if retired:
+                references = await db.scalar(
+                    select(func.count())
+                    .select_from(Document)
+                    .where(
+                        Document.file_hash == document.file_hash,
+                        Document.file_path == document.file_path,
+                    )
+                )
+                if references:
+                    document_service.restore_file(retired, document.file_path)
+                else:
+                    document_service.delete_file(retired)
 
         logger.info(f"Deleted document {document_id}")
         return True
@@ -1,104 +1,309 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from models import BriefSection, Document
+from schemas import SectionResponse, SectionPatch
+from services.cache_service import cache_service
+from services.schema_service import schema_service
+from services.autosave_service import autosave_service
 import uuid
 import json
 import logging
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+SECTION_INSERT_BATCH = 1000
+
+
+def normalize_value(value) -> str:
+    """Section content is stored as strings; structured values as JSON text"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
 
 class SectionController:
 
     # --------------------------------------------------
-    # Initialize sections when a brief is created
+    # Initialize sections when briefs are created
     # --------------------------------------------------
-    def initialize_sections(self, db: Session, brief_id: str):
+    async def initialize_sections(self, db: AsyncSession, brief_ids: list[str]):
         """
-        Creates the initial 11 sections for a new brief
+        Inserts the BRIEF_SCHEMA sections for new briefs in one
+        multi-row INSERT. The caller owns the transaction and commits.
         """
 
-        initial_sections = [
-            (1, "Event Overview"),
-            (2, "Objectives & Success Metrics"),
-            (3, "Audience & Attendees"),
-            (4, "Event Format & Structure"),
-            (5, "Program & Agenda"),
-            (6, "Speakers & Talent"),
-            (7, "Branding & Creative Direction"),
-            (8, "Production & Technical Requirements"),
-            (9, "Logistics & Operations"),
-            (10, "Budget & Commercials"),
-            (11, "Timeline & Key Milestones"),
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "brief_id": brief_id,
+                "section_number": section["sectionNumber"],
+                "section_name": section["sectionName"],
+                "content": {},
+                "ai_generated": {},
+            }
+            for brief_id in brief_ids
+            for section in schema_service.sections
         ]
 
-        sections = []
-
-        for number, name in initial_sections:
-            section = BriefSection(
-                id=str(uuid.uuid4()),
-                brief_id=brief_id,
-                section_number=number,
-                section_name=name,
-                content={},
-                ai_generated={}
-            )
-            db.add(section)
-            sections.append(section)
-
-        db.commit()
-        logger.info(f"Initialized {len(sections)} sections for brief {brief_id}")
-        return sections
+        # Multi-row VALUES, chunked to stay under driver bind-parameter limits
+        for start in range(0, len(rows), SECTION_INSERT_BATCH):
+            await db.execute(insert(BriefSection).values(rows[start:start + SECTION_INSERT_BATCH]))
+        logger.info(f"Initialized {len(rows)} sections for {len(brief_ids)} brief(s)")
+        return rows
 
     # --------------------------------------------------
     # Get all sections for a brief
     # --------------------------------------------------
-    def get_brief_sections(self, db: Session, brief_id: str):
-        return (
-            db.query(BriefSection)
-            .filter(BriefSection.brief_id == brief_id)
-            .order_by(BriefSection.section_number)
-            .all()
+    async def get_brief_sections(self, db: AsyncSession, brief_id: str):
+        cache_key = f"sections:brief:{brief_id}"
+
+        sections = await cache_service.get(cache_key)
+
+        if not sections:
+            result = await db.execute(
+                select(BriefSection)
+                .where(BriefSection.brief_id == brief_id)
+                .order_by(BriefSection.section_number)
+            )
+            sections = [
+                SectionResponse.model_validate(s).model_dump(mode="json")
+                for s in result.scalars().all()
+            ]
+
+            if sections:
+                await cache_service.set(cache_key, sections, ttl=3600)
+
+        return await self.with_pending(brief_id, sections)
+
+    @staticmethod
+    async def with_pending(brief_id: str, sections: List[dict]) -> List[dict]:
+        """Edits still in the write-behind buffer win over the stored content"""
+        pending = await autosave_service.pending(brief_id)
+        if not pending:
+            return sections
+        return [
+            {**s, "content": pending[s["id"]]} if s["id"] in pending else s
+            for s in sections
+        ]
+
+    async def get_sections_state(self, db: AsyncSession, brief_id: str) -> Tuple[Any, ...]:
+        """
+        What identifies the current section list of a brief, from one
+        aggregate query: (count, sum of row versions, last update, buffered
+        edits). The last update is None while edits are still buffered.
+        """
+        result = await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(BriefSection.row_version), 0),
+                func.max(BriefSection.updated_at),
+            ).where(BriefSection.brief_id == brief_id)
+        )
+        count, versions, last_modified = result.one()
+        return await self._state(brief_id, count, versions, last_modified)
+
+    async def sections_state(self, brief_id: str, sections: List[dict]) -> Tuple[Any, ...]:
+        """get_sections_state() of an already serialized section list"""
+        if not sections:
+            return await self._state(brief_id, 0, 0, None)
+        return await self._state(
+            brief_id,
+            len(sections),
+            sum(s.get("row_version", 1) for s in sections),
+            max(datetime.fromisoformat(s["updated_at"]) for s in sections),
         )
 
+    @staticmethod
+    async def _state(brief_id: str, count: int, versions: int, last_modified: Optional[datetime]) -> Tuple[Any, ...]:
+        pending = await autosave_service.pending(brief_id)
+        return count, int(versions), None if pending else last_modified, pending
+
     # --------------------------------------------------
     # Update section content (manual edit)
     # --------------------------------------------------
-    def update_section(self, db: Session, section_id: str, data: dict):
-        section = (
-            db.query(BriefSection)
-            .filter(BriefSection.id == section_id)
-            .first()
-        )
+    async def update_section(
+        self,
+        db: AsyncSession,
+        section_id: str,
+        data: dict,
+        expected_version: Optional[int] = None,
+    ):
+        """
+        Replaces a section's content. With `expected_version` (If-Match)
+        the write only happens if the section is still at that row
+        version; otherwise 412.
+        """
+        section = await db.get(BriefSection, section_id)
 
         if not section:
             raise HTTPException(status_code=404, detail="Section not found")
 
         content = data.get("content", {})
-        normalized: dict[str, str] = {}
+        normalized = {key: normalize_value(value) for key, value in content.items()}
 
-        for key, value in content.items():
-            if value is None:
-                normalized[key] = ""
-            elif isinstance(value, (dict, list)):
-                normalized[key] = json.dumps(value, ensure_ascii=False)
-            else:
-                normalized[key] = str(value)
+        if expected_version is None:
+            # Write-behind: acknowledge now, the autosave flusher persists it
+            # (and bumps the row version once, whatever the number of edits)
+            if autosave_service.enabled and await autosave_service.buffer(section.brief_id, section_id, normalized):
+                return SectionResponse.model_validate(section).model_copy(update={
+                    "content": normalized,
+                    "updated_at": datetime.utcnow(),
+                    "row_version": section.row_version + 1,
+                })
+        else:
+            # Compare against what is really stored, buffered edits included
+            await autosave_service.flush_brief(section.brief_id)
+
+        stmt = update(BriefSection).where(BriefSection.id == section_id)
+        if expected_version is not None:
+            stmt = stmt.where(BriefSection.row_version == expected_version)
 
-        section.content = normalized
+        result = await db.execute(
+            stmt.values(content=normalized, row_version=BriefSection.row_version + 1)
+            .returning(BriefSection)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        section = result.scalar_one_or_none()
 
-        db.commit()
-        db.refresh(section)
+        if section is None:
+            await db.rollback()
+            raise HTTPException(status_code=412, detail="Section was modified since it was read")
+
+        await db.commit()
+        await cache_service.delete(f"sections:brief:{section.brief_id}")
+        await cache_service.delete(f"briefs:{section.brief_id}:full")
         logger.info(f"Updated section {section_id}")
 
         return section
 
+    # --------------------------------------------------
+    # Merge-patch several sections of a brief at once
+    # --------------------------------------------------
+    async def patch_sections(self, db: AsyncSession, brief_id: str, patches: List[SectionPatch]):
+        """
+        Applies JSON merge patches (null removes a key) to the content and
+        ai_generated of several sections in one transaction. Sections the
+        patch leaves unchanged are not written. A patch carrying a
+        row_version fails with 412 if its section has moved on. Returns the
+        changed sections.
+        """
+
+        # Merge onto the latest edits, not on what autosave hasn't written yet
+        await autosave_service.flush_brief(brief_id)
+
+        result = await db.execute(
+            select(
+                BriefSection.id,
+                BriefSection.section_number,
+                BriefSection.content,
+                BriefSection.ai_generated,
+                BriefSection.row_version,
+            ).where(BriefSection.brief_id == brief_id)
+        )
+        current = result.all()
+
+        if not current:
+            raise HTTPException(status_code=404, detail="Brief not found")
+
+        by_id = {row.id: row for row in current}
+        by_number = {row.section_number: row for row in current}
+        changes = {}
+        errors = {}
+
+        for patch in patches:
+            row = by_id.get(patch.section_id) if patch.section_id else by_number.get(patch.section_number)
+            if row is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Section not found: {patch.section_id or patch.section_number}",
+                )
+            if patch.row_version is not None and patch.row_version != row.row_version:
+                raise HTTPException(
+                    status_code=412,
+                    detail=f"Section {row.section_number} was modified since it was read",
+                )
+
+            values = changes.get(row.id, {})
+
+            if patch.content:
+                field_errors = schema_service.validate_content(
+                    row.section_number,
+                    {k: v for k, v in patch.content.items() if v is not None},
+                )
+                errors.update({f"{row.section_number}.{k}": e for k, e in field_errors.items()})
+
+                base = values.get("content", row.content or {})
+                merged = self._merge(base, {
+                    k: None if v is None else normalize_value(v) for k, v in patch.content.items()
+                })
+                if merged != (row.content or {}):
+                    values["content"] = merged
+
+            if patch.ai_generated:
+                base = values.get("ai_generated", row.ai_generated or {})
+                merged = self._merge(base, patch.ai_generated)
+                if merged != (row.ai_generated or {}):
+                    values["ai_generated"] = merged
+
+            if values:
+                changes[row.id] = values
+
+        if errors:
+            raise HTTPException(status_code=422, detail={"errors": errors})
+
+        if not changes:
+            return []
+
+        updated = []
+        for section_id, values in changes.items():
+            # Guard on the version read above so a concurrent write isn't lost
+            result = await db.execute(
+                update(BriefSection)
+                .where(
+                    BriefSection.id == section_id,
+                    BriefSection.row_version == by_id[section_id].row_version,
+                )
+                .values(**values, row_version=BriefSection.row_version + 1)
+                .returning(BriefSection)
+                .execution_options(synchronize_session=False)
+            )
+            section = result.scalar_one_or_none()
+            if section is None:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=412,
+                    detail=f"Section {by_id[section_id].section_number} was modified since it was read",
+                )
+            updated.append(section)
+
+        await db.commit()
+        await cache_service.delete(f"sections:brief:{brief_id}")
+        await cache_service.delete(f"briefs:{brief_id}:full")
+        logger.info(f"Patched {len(updated)} section(s) of brief {brief_id}")
+
+        return sorted(updated, key=lambda s: s.section_number)
+
+    @staticmethod
+    def _merge(base: dict, patch: dict) -> dict:
+        merged = dict(base)
+        for key, value in patch.items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        return merged
+
     # --------------------------------------------------
     # Auto-populate section from uploaded documents
     # --------------------------------------------------
-    def auto_populate_from_document(
+    async def auto_populate_from_document(
         self,
-        db: Session,
+        db: AsyncSession,
         section_id: str,
         brief_id: str
     ):
@@ -107,20 +312,18 @@ class SectionController:
         For now, this aggregates document text into a single field.
         """
 
-        section = (
-            db.query(BriefSection)
-            .filter(BriefSection.id == section_id)
-            .first()
-        )
+        await autosave_service.flush_brief(brief_id)
+
+        section = await db.get(BriefSection, section_id)
 
         if not section:
             raise HTTPException(status_code=404, detail="Section not found")
 
-        documents = (
-            db.query(Document)
-            .filter(Document.brief_id == brief_id)
-            .all()
+        result = await db.execute(
+            select(Document)
+            .where(Document.brief_id == brief_id)
         )
+        documents = result.scalars().all()
 
         if not documents:
             raise HTTPException(
@@ -143,9 +346,12 @@ class SectionController:
         section.content = {
             "auto_populated_notes": combined_text
         }
+        section.row_version = BriefSection.row_version + 1
 
-        db.commit()
-        db.refresh(section)
+        await db.commit()
+        await db.refresh(section)
+        await cache_service.delete(f"sections:brief:{section.brief_id}")
+        await cache_service.delete(f"briefs:{section.brief_id}:full")
 
         logger.info(f"Auto-populated section {section_id} from documents")
         return section
@@ -1,28 +1,128 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set in environment variables")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True
+# Connection pool settings (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Map sync driver URLs onto their async counterparts
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str):
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver:
+        parsed = parsed.set(drivername=driver)
+    return parsed
+
+
+engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=DB_POOL_TIMEOUT,
 )
 
-SessionLocal = sessionmaker(
-    autocommit=False,
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False,
 )
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+def sync_schema(conn):
+    Base.metadata.create_all(conn)
+
+    # create_all skips columns and indexes on tables that already exist
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        nullable = {c["name"]: c["nullable"] for c in inspector.get_columns(table.name)}
+        relaxed = [
+            column for column in table.columns
+            if column.nullable and nullable.get(column.name) is False
+        ]
+        if relaxed:
+            _drop_not_null(conn, table, relaxed)
+            inspector.clear_cache()
+
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=conn.dialect)
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                # Backfill existing rows
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                conn.execute(text(ddl))
+
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                try:
+                    with conn.begin_nested():
+                        index.create(conn)
+                except IntegrityError as e:
+                    # e.g. a unique index over rows that already hold duplicates
+                    logger.error(f"Could not create index {index.name}: {e.orig}")
+
+
+def _drop_not_null(conn, table, columns):
+    """Relax NOT NULL constraints the models no longer declare"""
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, table)
+    else:
+        for column in columns:
+            conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} DROP NOT NULL"))
+    logger.info(f"Dropped NOT NULL on {table.name}: {', '.join(c.name for c in columns)}")
+
+
+def _rebuild_sqlite_table(conn, table):
+    """
+    SQLite can't alter a column: copy the rows into a table created from
+    the model and swap it in. Indexes are recreated by sync_schema after.
+    """
+    rebuilt = f"{table.name}__rebuild"
+    ddl = str(CreateTable(table).compile(dialect=conn.dialect))
+    copied = ", ".join(
+        c["name"] for c in inspect(conn).get_columns(table.name) if c["name"] in table.c
+    )
+
+    conn.execute(text(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+    conn.execute(text(f"INSERT INTO {rebuilt} ({copied}) SELECT {copied} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(sync_schema)
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
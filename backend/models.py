@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey, Integer, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey, Integer, Boolean, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -11,6 +11,12 @@ class BriefStatus(enum.Enum):
     COMPLETED = "completed"
     ARCHIVED = "archived"
 
+class ExtractionStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class Brief(Base):
     __tablename__ = "briefs"
     
@@ -22,11 +28,18 @@ class Brief(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     version = Column(Integer, default=1)
     brief_metadata = Column(JSON, default=dict)
+    row_version = Column(Integer, nullable=False, default=1, server_default="1")  # optimistic concurrency
     
     sections = relationship("BriefSection", back_populates="brief", cascade="all, delete-orphan")
     documents = relationship("Document", back_populates="brief", cascade="all, delete-orphan")
     versions = relationship("BriefVersion", back_populates="brief", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination on (updated_at, id), with and without a status filter
+        Index("ix_briefs_updated_at_id", "updated_at", "id"),
+        Index("ix_briefs_status_updated_at_id", "status", "updated_at", "id"),
+    )
+
 class BriefSection(Base):
     __tablename__ = "brief_sections"
     
@@ -36,11 +49,16 @@ class BriefSection(Base):
     section_name = Column(String, nullable=False)
     content = Column(JSON, default=dict)  # Stores field-value pairs
     ai_generated = Column(JSON, default=dict)  # Stores AI suggestions
+    row_version = Column(Integer, nullable=False, default=1, server_default="1")  # optimistic concurrency
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     brief = relationship("Brief", back_populates="sections")
 
+    __table_args__ = (
+        Index("ix_brief_sections_brief_id_section_number", "brief_id", "section_number"),
+    )
+
 class Document(Base):
     __tablename__ = "documents"
     
@@ -50,19 +68,45 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_type = Column(String, nullable=False)
     mime_type = Column(String)
+    file_size = Column(Integer)
+    file_hash = Column(String)  # SHA-256 of the uploaded bytes
     extracted_content = Column(JSON, default=dict)
+    extraction_status = Column(String, default=ExtractionStatus.PENDING.value)
+    extraction_error = Column(Text)
+    extraction_started_at = Column(DateTime)  # when a worker claimed the job
 
     uploaded_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     brief = relationship("Brief", back_populates="documents")
 
+    __table_args__ = (
+        Index("ix_documents_brief_id_uploaded_at", "brief_id", "uploaded_at"),
+        # Content-addressed storage: reference counts and extraction reuse
+        Index("ix_documents_file_hash", "file_hash"),
+        # Unfinished extractions are looked up at startup. Partial: almost
+        # every row is completed, so only the few unfinished ones are indexed
+        Index(
+            "ix_documents_unfinished_extraction",
+            "extraction_status",
+            sqlite_where=text("extraction_status IN ('pending', 'processing')"),
+            postgresql_where=text("extraction_status IN ('pending', 'processing')"),
+        ),
+    )
+
 class BriefVersion(Base):
     __tablename__ = "brief_versions"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     brief_id = Column(String, ForeignKey("briefs.id"), nullable=False)
     version_number = Column(Integer, nullable=False)
-    content_snapshot = Column(JSON, nullable=False)  # Full brief data
+    is_checkpoint = Column(Boolean, default=True)
+    content_snapshot = Column(JSON)  # Full brief data (checkpoints only)
+    delta = Column(JSON)  # Field-level changes since the previous version
     created_at = Column(DateTime, default=datetime.utcnow)
     
     brief = relationship("Brief", back_populates="versions")
+
+    __table_args__ = (
+        Index("uq_brief_versions_brief_id_version_number", "brief_id", "version_number", unique=True),
+    )
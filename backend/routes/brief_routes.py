@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 from database import get_db
-from schemas import BriefCreate, BriefUpdate, BriefResponse
-from controllers.brief_controller import brief_controller
+from schemas import (
+    BriefCreate, BriefUpdate, BriefResponse, BriefListResponse,
+    BulkExportRequest, BulkExportJobResponse, SectionsPatch, SectionResponse, BriefFullResponse,
+)
+from controllers.brief_controller import brief_controller, StaleWriteError, VersionConflictError
 from controllers.section_controller import section_controller
+from services.export_service import EXPORT_MEDIA_TYPES, iter_file
+from services.bulk_export_service import bulk_export_service
+from services.export_cache_service import EXPORT_EXTENSIONS
+from routes.conditional import is_not_modified, not_modified, parse_if_match, row_etag, validator_headers
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,81 +22,208 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/briefs", tags=["Briefs"])
 
 @router.post("/", response_model=BriefResponse, status_code=status.HTTP_201_CREATED)
-def create_brief(brief: BriefCreate, db: Session = Depends(get_db)):
+async def create_brief(brief: BriefCreate, db: AsyncSession = Depends(get_db)):
     """Create a new brief and initialize sections"""
     try:
-        # Create brief
-        new_brief = brief_controller.create_brief(db, brief)
-        
-        # Initialize all sections
-        section_controller.initialize_sections(db, new_brief.id)
-        
-        return new_brief
+        return await brief_controller.create_brief(db, brief)
     except Exception as e:
         logger.error(f"Error creating brief: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[BriefResponse])
-def get_briefs(status: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all briefs with optional status filter"""
+@router.post("/bulk", response_model=List[BriefResponse], status_code=status.HTTP_201_CREATED)
+async def create_briefs(briefs: List[BriefCreate] = Body(..., max_length=500), db: AsyncSession = Depends(get_db)):
+    """Create many briefs (with sections) in one transaction"""
     try:
-        briefs = brief_controller.get_all_briefs(db, status, skip, limit)
-        return briefs
+        return await brief_controller.create_briefs(db, briefs)
+    except Exception as e:
+        logger.error(f"Error creating briefs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/", response_model=BriefListResponse)
+async def get_briefs(
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a page of briefs with optional status filter; pass next_cursor to continue"""
+    try:
+        return await brief_controller.get_all_briefs(db, status, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting briefs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/export", response_model=BulkExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def export_briefs(request: BulkExportRequest, db: AsyncSession = Depends(get_db)):
+    """Start a ZIP export of the given briefs (or every brief with a status)"""
+    try:
+        job = await brief_controller.export_briefs(
+            db,
+            brief_ids=request.brief_ids,
+            status=request.status.value if request.status else None,
+            format=request.format,
+        )
+        if not job:
+            raise HTTPException(status_code=404, detail="No briefs matched")
+        return job.to_dict()
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting bulk export: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export/jobs/{job_id}", response_model=BulkExportJobResponse)
+async def get_export_job(job_id: str):
+    """Progress of a bulk export job"""
+    job = await bulk_export_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job.to_dict()
+
+@router.get("/export/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """Stream the finished ZIP; each archive can be downloaded once"""
+    job = await bulk_export_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    output = await bulk_export_service.take_output(job_id)
+    if not output:
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+
+    return StreamingResponse(
+        iter_file(output),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="briefs_{job_id}.zip"'},
+    )
+
 @router.get("/{brief_id}", response_model=BriefResponse)
-def get_brief(brief_id: str, db: Session = Depends(get_db)):
-    """Get a specific brief"""
-    brief = brief_controller.get_brief(db, brief_id)
+async def get_brief(brief_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Get a specific brief; 304 if If-None-Match / If-Modified-Since still hold"""
+    if request.headers.get("if-none-match") or request.headers.get("if-modified-since"):
+        # Revalidate from row_version/updated_at alone
+        state = await brief_controller.get_brief_state(db, brief_id)
+        if not state:
+            raise HTTPException(status_code=404, detail="Brief not found")
+        row_version, updated_at = state
+        if is_not_modified(request, row_etag(row_version), updated_at):
+            return not_modified(row_etag(row_version), updated_at)
+
+    brief = await brief_controller.get_brief(db, brief_id)
+    if not brief:
+        raise HTTPException(status_code=404, detail="Brief not found")
+    response.headers.update(validator_headers(
+        row_etag(brief["row_version"]), datetime.fromisoformat(brief["updated_at"])
+    ))
+    return brief
+
+@router.get("/{brief_id}/full", response_model=BriefFullResponse)
+async def get_brief_full(brief_id: str, db: AsyncSession = Depends(get_db)):
+    """Brief, sections, document metadata and latest version number in one response"""
+    brief = await brief_controller.get_brief_full(db, brief_id)
     if not brief:
         raise HTTPException(status_code=404, detail="Brief not found")
     return brief
 
 @router.put("/{brief_id}", response_model=BriefResponse)
-def update_brief(brief_id: str, brief: BriefUpdate, db: Session = Depends(get_db)):
-    """Update a brief"""
-    updated_brief = brief_controller.update_brief(db, brief_id, brief)
+async def update_brief(
+    brief_id: str,
+    brief: BriefUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update a brief; with If-Match, only if it is still at that version (412 otherwise)"""
+    try:
+        updated_brief = await brief_controller.update_brief(db, brief_id, brief, parse_if_match(if_match))
+    except StaleWriteError as e:
+        raise HTTPException(status_code=412, detail=str(e))
     if not updated_brief:
         raise HTTPException(status_code=404, detail="Brief not found")
+    response.headers["ETag"] = row_etag(updated_brief.row_version)
     return updated_brief
 
 @router.delete("/{brief_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_brief(brief_id: str, db: Session = Depends(get_db)):
+async def delete_brief(brief_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a brief"""
-    success = brief_controller.delete_brief(db, brief_id)
+    success = await brief_controller.delete_brief(db, brief_id)
     if not success:
         raise HTTPException(status_code=404, detail="Brief not found")
     return None
 
+@router.patch("/{brief_id}/sections", response_model=List[SectionResponse])
+async def patch_sections(brief_id: str, patch: SectionsPatch, db: AsyncSession = Depends(get_db)):
+    """Merge-patch several sections in one transaction; returns only the sections that changed"""
+    return await section_controller.patch_sections(db, brief_id, patch.sections)
+
 @router.post("/{brief_id}/versions")
-def create_version(brief_id: str, db: Session = Depends(get_db)):
+async def create_version(brief_id: str, db: AsyncSession = Depends(get_db)):
     """Create a version snapshot of a brief"""
-    version = brief_controller.create_version(db, brief_id)
+    try:
+        version = await brief_controller.create_version(db, brief_id)
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not version:
         raise HTTPException(status_code=404, detail="Brief not found")
     return {"version_number": version.version_number, "created_at": version.created_at}
 
 @router.get("/{brief_id}/versions")
-def get_versions(brief_id: str, db: Session = Depends(get_db)):
+async def get_versions(brief_id: str, db: AsyncSession = Depends(get_db)):
     """Get all versions of a brief"""
-    versions = brief_controller.get_versions(db, brief_id)
-    return [{"version_number": v.version_number, "created_at": v.created_at, "id": v.id} for v in versions]
+    versions = await brief_controller.get_versions(db, brief_id)
+    return [
+        {"version_number": v.version_number, "created_at": v.created_at, "id": v.id, "is_checkpoint": v.is_checkpoint}
+        for v in versions
+    ]
+
+@router.get("/{brief_id}/versions/diff")
+async def diff_versions(
+    brief_id: str,
+    from_version: int = Query(..., alias="from"),
+    to_version: int = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Changed fields per section between two versions"""
+    diff = await brief_controller.diff_versions(db, brief_id, from_version, to_version)
+    if not diff:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return diff
+
+@router.get("/{brief_id}/versions/{version_number}")
+async def get_version(brief_id: str, version_number: int, db: AsyncSession = Depends(get_db)):
+    """Get the full content of one version"""
+    version = await brief_controller.get_version(db, brief_id, version_number)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return version
 
 @router.get("/{brief_id}/export")
-def export_brief(brief_id: str, format: str = "pdf", db: Session = Depends(get_db)):
+async def export_brief(brief_id: str, format: str = "pdf", db: AsyncSession = Depends(get_db)):
     """Export brief to PDF or Word"""
     try:
-        file_path = brief_controller.export_brief(db, brief_id, format)
-        if not file_path:
+        output = await brief_controller.export_brief(db, brief_id, format)
+        if not output:
             raise HTTPException(status_code=404, detail="Brief not found")
-        
-        return FileResponse(
-            path=file_path,
-            filename=file_path.split("/")[-1],
-            media_type="application/octet-stream"
+
+        size = output.seek(0, os.SEEK_END)
+        output.seek(0)
+
+        return StreamingResponse(
+            iter_file(output),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="brief_{brief_id}.{EXPORT_EXTENSIONS[format]}"',
+                "Content-Length": str(size),
+            },
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error exporting brief: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
 from database import get_db
 from schemas import DocumentResponse
 from controllers.document_controller import document_controller
+from services.document_service import FileTooLargeError, InvalidUploadError, MultipartUpload
+from services.extraction_service import extraction_service
+from routes.conditional import collection_etag, is_not_modified, not_modified, validator_headers
 
 logger = logging.getLogger(__name__)
 
@@ -16,34 +19,57 @@ router = APIRouter(prefix="/documents", tags=["Documents"])
     "/upload",
     response_model=DocumentResponse,
     status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
 )
 async def upload_document(
     brief_id: str,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Upload a document to a brief
+    Upload a document to a brief.
+    The file is read off the request stream (not spooled by the form
+    parser), so MAX_UPLOAD_SIZE applies while it arrives.
+    Extraction runs in the background: the document is returned with
+    extraction_status "pending"; poll GET /documents/{id} for the result.
     """
 
-    if not file.filename:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Filename is required",
-        )
-
     try:
-        content = await file.read()
+        upload = MultipartUpload(request)
+        filename = await upload.next_file("file")
 
         document = await document_controller.upload_document(
             db=db,
             brief_id=brief_id,
-            filename=file.filename,
-            file_content=content,
+            filename=filename,
+            chunks=upload.chunks(),
         )
 
         return document
 
+    except InvalidUploadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -55,7 +81,7 @@ async def upload_document(
 async def analyze_document(
     document_id: str,
     section_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Analyze a document with AI for a specific section
@@ -73,26 +99,53 @@ async def analyze_document(
         raise HTTPException(status_code=500, detail="Failed to analyze document")
 
 
+@router.get("/extraction/stats")
+async def get_extraction_stats():
+    """
+    Extraction queue depth and per-job timing for this worker
+    """
+    return extraction_service.stats()
+
+
 @router.get("/brief/{brief_id}", response_model=List[DocumentResponse])
-def get_brief_documents(brief_id: str, db: Session = Depends(get_db)):
+async def get_brief_documents(
+    brief_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Documents of a brief. Clients polling for extraction results should
+    send If-None-Match; unchanged lists get a 304 from one aggregate query.
+    """
     try:
-        return document_controller.get_brief_documents(db, brief_id)
+        if request.headers.get("if-none-match") or request.headers.get("if-modified-since"):
+            count, last_modified = await document_controller.get_documents_state(db, brief_id)
+            etag = collection_etag(count, last_modified)
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+        documents = await document_controller.get_brief_documents(db, brief_id)
+
+        count, last_modified = document_controller.documents_state(documents)
+        response.headers.update(validator_headers(collection_etag(count, last_modified), last_modified))
+        return documents
     except Exception:
         logger.exception("Error fetching documents")
         raise HTTPException(status_code=500, detail="Failed to fetch documents")
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-def get_document(document_id: str, db: Session = Depends(get_db)):
-    document = document_controller.get_document(db, document_id)
+async def get_document(document_id: str, db: AsyncSession = Depends(get_db)):
+    document = await document_controller.get_document(db, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
 
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_document(document_id: str, db: Session = Depends(get_db)):
-    success = document_controller.delete_document(db, document_id)
+async def delete_document(document_id: str, db: AsyncSession = Depends(get_db)):
+    success = await document_controller.delete_document(db, document_id)
     if not success:
         raise HTTPException(status_code=404, detail="Document not found")
     return None
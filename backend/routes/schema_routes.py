@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request, Response
+from services.schema_service import schema_service
+from routes.conditional import is_not_modified
+
+router = APIRouter(prefix="/schema", tags=["Schema"])
+
+# The schema only changes with a deploy; the ETag catches that
+SCHEMA_CACHE_CONTROL = "public, max-age=86400"
+
+
+@router.get("")
+async def get_schema(request: Request):
+    """The brief template (sections, field groups, fields and options)"""
+    headers = {"ETag": schema_service.etag, "Cache-Control": SCHEMA_CACHE_CONTROL}
+
+    if is_not_modified(request, schema_service.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=schema_service.payload, media_type="application/json", headers=headers)
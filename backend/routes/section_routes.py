@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from database import get_db
 from schemas import SectionCreate, SectionUpdate, SectionResponse
 from controllers.section_controller import section_controller
+from routes.conditional import (
+    collection_etag, is_not_modified, not_modified, parse_if_match, row_etag, validator_headers,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,45 +14,65 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/sections", tags=["Sections"])
 
 @router.post("/", response_model=SectionResponse, status_code=status.HTTP_201_CREATED)
-def create_section(section: SectionCreate, brief_id: str, db: Session = Depends(get_db)):
+async def create_section(section: SectionCreate, brief_id: str, db: AsyncSession = Depends(get_db)):
     """Create a new section"""
     try:
-        new_section = section_controller.create_section(db, brief_id, section)
+        new_section = await section_controller.create_section(db, brief_id, section)
         return new_section
     except Exception as e:
         logger.error(f"Error creating section: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/brief/{brief_id}", response_model=List[SectionResponse])
-def get_brief_sections(brief_id: str, db: Session = Depends(get_db)):
-    """Get all sections for a brief"""
+async def get_brief_sections(brief_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Get all sections for a brief; 304 if If-None-Match / If-Modified-Since still hold"""
     try:
-        sections = section_controller.get_brief_sections(db, brief_id)
+        if request.headers.get("if-none-match") or request.headers.get("if-modified-since"):
+            # Revalidate from one aggregate query instead of loading the sections
+            state = await section_controller.get_sections_state(db, brief_id)
+            etag, last_modified = collection_etag(*state), state[2]
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+        sections = await section_controller.get_brief_sections(db, brief_id)
+
+        # Tag what is actually sent, so a stale cache entry can't get a fresh tag
+        state = await section_controller.sections_state(brief_id, sections)
+        response.headers.update(validator_headers(collection_etag(*state), state[2]))
         return sections
     except Exception as e:
         logger.error(f"Error getting sections: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{section_id}", response_model=SectionResponse)
-def get_section(section_id: str, db: Session = Depends(get_db)):
+async def get_section(section_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific section"""
-    section = section_controller.get_section(db, section_id)
+    section = await section_controller.get_section(db, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     return section
 
 @router.put("/{section_id}", response_model=SectionResponse)
-def update_section(section_id: str, section: SectionUpdate, db: Session = Depends(get_db)):
-    """Update a section"""
-    updated_section = section_controller.update_section(db, section_id, section)
+async def update_section(
+    section_id: str,
+    section: SectionUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update a section; with If-Match, only if it is still at that version (412 otherwise)"""
+    updated_section = await section_controller.update_section(
+        db, section_id, section.model_dump(exclude_unset=True), parse_if_match(if_match)
+    )
     if not updated_section:
         raise HTTPException(status_code=404, detail="Section not found")
+    response.headers["ETag"] = row_etag(updated_section.row_version)
     return updated_section
 
 @router.delete("/{section_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_section(section_id: str, db: Session = Depends(get_db)):
+async def delete_section(section_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a section"""
-    success = section_controller.delete_section(db, section_id)
+    success = await section_controller.delete_section(db, section_id)
     if not success:
         raise HTTPException(status_code=404, detail="Section not found")
     return None
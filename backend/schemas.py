@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
@@ -29,10 +29,28 @@ class BriefResponse(BaseModel):
     updated_at: datetime
     version: int
     brief_metadata: Dict[str, Any]
+    row_version: int = 1
     
     class Config:
         from_attributes = True
 
+class BriefListResponse(BaseModel):
+    items: List[BriefResponse]
+    next_cursor: Optional[str] = None
+
+class BulkExportRequest(BaseModel):
+    brief_ids: Optional[List[str]] = Field(None, max_length=500)
+    status: Optional[BriefStatus] = None
+    format: str = "pdf"
+
+class BulkExportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    format: str
+    total: int
+    completed: int
+    error: Optional[str] = None
+
 class SectionCreate(BaseModel):
     section_number: int
     section_name: str
@@ -42,6 +60,22 @@ class SectionUpdate(BaseModel):
     content: Optional[Dict[str, Any]] = None
     ai_generated: Optional[Dict[str, Any]] = None
 
+class SectionPatch(BaseModel):
+    section_id: Optional[str] = None
+    section_number: Optional[int] = None
+    row_version: Optional[int] = None  # reject the patch if the section has moved on
+    content: Optional[Dict[str, Any]] = None
+    ai_generated: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if not self.section_id and self.section_number is None:
+            raise ValueError("section_id or section_number is required")
+        return self
+
+class SectionsPatch(BaseModel):
+    sections: List[SectionPatch] = Field(..., max_length=100)
+
 class SectionResponse(BaseModel):
     id: str
     brief_id: str
@@ -51,6 +85,7 @@ class SectionResponse(BaseModel):
     ai_generated: Dict[str, Any]
     created_at: datetime
     updated_at: datetime
+    row_version: int = 1
     
     class Config:
         from_attributes = True
@@ -60,12 +95,34 @@ class DocumentResponse(BaseModel):
     brief_id: str
     filename: str
     file_type: str
+    file_size: Optional[int] = None
+    file_hash: Optional[str] = None
     uploaded_at: datetime
-    extracted_content: Optional[str]
+    extraction_status: Optional[str] = None
+    extraction_error: Optional[str] = None
+    extracted_content: Optional[Dict[str, Any]]
     
     class Config:
         from_attributes = True
 
+class DocumentMetadataResponse(BaseModel):
+    """A document without its extracted text"""
+    id: str
+    filename: str
+    file_type: str
+    file_size: Optional[int] = None
+    uploaded_at: datetime
+    extraction_status: Optional[str] = None
+    extraction_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BriefFullResponse(BriefResponse):
+    latest_version: Optional[int] = None
+    sections: List[SectionResponse]
+    documents: List[DocumentMetadataResponse]
+
 class AIGenerateRequest(BaseModel):
     section_name: str
     context: Optional[Dict[str, Any]] = {}
@@ -5,8 +5,12 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-from database import Base, engine
-from routes import brief_routes, section_routes, document_routes, ai_routes
+from database import init_db, engine
+from services.cache_service import cache_service
+from services.extraction_service import extraction_service
+from services.bulk_export_service import bulk_export_service
+from services.autosave_service import autosave_service
+from routes import brief_routes, section_routes, document_routes, ai_routes, schema_routes
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -31,20 +35,35 @@ app.add_middleware(
 
 # ✅ Safe DB initialization
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     logger.info("Initializing database")
-    Base.metadata.create_all(bind=engine)
+    await init_db()
+    await extraction_service.resume_pending()
+    autosave_service.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await autosave_service.stop()
+    extraction_service.shutdown()
+    bulk_export_service.shutdown()
+    await cache_service.close()
+    await engine.dispose()
 
 # Health check
 @app.get("/api/health")
 def health():
     return {"status": "healthy"}
 
+@app.get("/api/health/cache")
+def cache_health():
+    return cache_service.stats()
+
 # Routes
 app.include_router(brief_routes.router, prefix="/api")
 app.include_router(section_routes.router, prefix="/api")
 app.include_router(document_routes.router, prefix="/api")
 app.include_router(ai_routes.router, prefix="/api")
+app.include_router(schema_routes.router, prefix="/api")
 
 # Root
 @app.get("/")
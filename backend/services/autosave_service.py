@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Dict, Optional
+
+import redis
+from sqlalchemy import update
+
+from database import AsyncSessionLocal
+from models import BriefSection
+from services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+DIRTY_BRIEFS_KEY = "autosave:dirty"
+
+# Upper bound on one flush; a crashed flusher's lock expires after this
+FLUSH_LOCK_TTL_MS = 30000
+FLUSH_LOCK_POLL = 0.05
+
+
+class AutosaveService:
+    """
+    Optional write-behind buffer for section edits.
+
+    Edits are stored in Redis (one hash per brief: section id -> content)
+    and acknowledged without touching the database. A background task
+    writes the latest content of each buffered section every flush
+    interval; version snapshots and exports flush their brief first.
+    """
+
+    def __init__(self):
+        self.requested = os.getenv("AUTOSAVE_WRITE_BEHIND", "false").lower() == "true"
+        self.flush_interval = int(os.getenv("AUTOSAVE_FLUSH_INTERVAL_MS", "2000")) / 1000
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requested and cache_service.redis_client is not None
+
+    @staticmethod
+    def _brief_key(brief_id: str) -> str:
+        return f"autosave:brief:{brief_id}"
+
+    async def buffer(self, brief_id: str, section_id: str, content: dict) -> bool:
+        """Buffer a section's full content; False means write it directly instead"""
+        try:
+            pipe = cache_service.redis_client.pipeline()
+            pipe.hset(self._brief_key(brief_id), section_id, json.dumps(content))
+            pipe.sadd(DIRTY_BRIEFS_KEY, brief_id)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error buffering section {section_id}: {str(e)}")
+            return False
+
+    async def pending(self, brief_id: str) -> Dict[str, dict]:
+        """Buffered content for a brief's sections, keyed by section id"""
+        if not self.enabled:
+            return {}
+        try:
+            raw = await cache_service.redis_client.hgetall(self._brief_key(brief_id))
+        except Exception as e:
+            logger.error(f"Error reading autosave buffer: {str(e)}")
+            return {}
+        return {section_id: json.loads(content) for section_id, content in raw.items()}
+
+    async def flush_brief(self, brief_id: str) -> int:
+        """Write a brief's buffered sections to the database"""
+        if not self.enabled:
+            return 0
+
+        # One flush per brief at a time: an older read must not land after a newer write
+        try:
+            token = await self._acquire_flush_lock(brief_id)
+        except Exception as e:
+            logger.error(f"Error locking autosave buffer: {str(e)}")
+            return 0
+
+        try:
+            return await self._flush_locked(brief_id)
+        finally:
+            await self._release_flush_lock(brief_id, token)
+
+    async def _flush_locked(self, brief_id: str) -> int:
+        key = self._brief_key(brief_id)
+        try:
+            raw = await cache_service.redis_client.hgetall(key)
+        except Exception as e:
+            logger.error(f"Error reading autosave buffer: {str(e)}")
+            return 0
+
+        if raw:
+            await self._write(raw)
+
+            # Invalidate before dropping the buffer entries, so a read in between
+            # gets the buffered copy rather than a stale cached one
+            await cache_service.delete(f"sections:brief:{brief_id}")
+            await cache_service.delete(f"briefs:{brief_id}:full")
+
+            # Drop only entries that weren't overwritten while we were writing
+            for section_id, content in raw.items():
+                await self._discard_if_unchanged(key, section_id, content)
+
+            self.flushed += len(raw)
+
+        await self._clear_dirty_if_empty(brief_id)
+        return len(raw)
+
+    async def _write(self, raw: Dict[str, str]):
+        async with AsyncSessionLocal() as db:
+            for section_id, content in raw.items():
+                await db.execute(
+                    update(BriefSection)
+                    .where(BriefSection.id == section_id)
+                    .values(content=json.loads(content), row_version=BriefSection.row_version + 1)
+                )
+            await db.commit()
+
+    async def flush_all(self):
+        if not self.enabled:
+            return
+
+        try:
+            brief_ids = await cache_service.redis_client.smembers(DIRTY_BRIEFS_KEY)
+        except Exception as e:
+            logger.error(f"Error reading autosave dirty set: {str(e)}")
+            return
+
+        for brief_id in brief_ids:
+            try:
+                await self.flush_brief(brief_id)
+            except Exception as e:
+                logger.error(f"Error flushing autosave for brief {brief_id}: {str(e)}")
+
+    async def discard_brief(self, brief_id: str):
+        """Forget buffered edits of a deleted brief"""
+        if not self.enabled:
+            return
+        pipe = cache_service.redis_client.pipeline()
+        pipe.delete(self._brief_key(brief_id))
+        pipe.srem(DIRTY_BRIEFS_KEY, brief_id)
+        await pipe.execute()
+
+    @staticmethod
+    def _lock_key(brief_id: str) -> str:
+        return f"autosave:lock:{brief_id}"
+
+    async def _acquire_flush_lock(self, brief_id: str) -> str:
+        token = str(uuid.uuid4())
+        while not await cache_service.redis_client.set(
+            self._lock_key(brief_id), token, nx=True, px=FLUSH_LOCK_TTL_MS
+        ):
+            await asyncio.sleep(FLUSH_LOCK_POLL)
+        return token
+
+    async def _release_flush_lock(self, brief_id: str, token: str):
+        key = self._lock_key(brief_id)
+        async with cache_service.redis_client.pipeline() as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) == token:
+                    pipe.multi()
+                    pipe.delete(key)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()  # expired and taken by another flush
+            except redis.WatchError:
+                pass
+            except Exception as e:
+                logger.error(f"Error releasing autosave lock for brief {brief_id}: {str(e)}")
+
+    async def _discard_if_unchanged(self, key: str, section_id: str, content: str):
+        async with cache_service.redis_client.pipeline() as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.hget(key, section_id) == content:
+                    pipe.multi()
+                    pipe.hdel(key, section_id)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+            except redis.WatchError:
+                pass  # edited mid-flush; the next flush writes it
+
+    async def _clear_dirty_if_empty(self, brief_id: str):
+        key = self._brief_key(brief_id)
+        async with cache_service.redis_client.pipeline() as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.hlen(key) == 0:
+                    pipe.multi()
+                    pipe.srem(DIRTY_BRIEFS_KEY, brief_id)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+            except redis.WatchError:
+                pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_all()
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Autosave write-behind enabled (flush every {self.flush_interval}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            await self.flush_all()
+
+
+autosave_service = AutosaveService()
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from services.cache_service import cache_service
+from services.export_service import render_export
+from services.export_cache_service import EXPORT_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+
+class BulkExportJob:
+    def __init__(
+        self,
+        total: int,
+        format: str,
+        id: Optional[str] = None,
+        completed: int = 0,
+        status: str = "pending",
+        error: Optional[str] = None,
+        created_at: Optional[float] = None,
+    ):
+        self.id = id or str(uuid.uuid4())
+        self.format = format
+        self.total = total
+        self.completed = completed
+        self.status = status
+        self.error = error
+        self.created_at = created_at or time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "total": self.total,
+            "completed": self.completed,
+            "error": self.error,
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        """Redis hash fields"""
+        return {
+            "format": self.format,
+            "total": self.total,
+            "completed": self.completed,
+            "status": self.status,
+            "error": self.error or "",
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_state(cls, job_id: str, state: Dict[str, str]) -> "BulkExportJob":
+        return cls(
+            id=job_id,
+            format=state["format"],
+            total=int(state["total"]),
+            completed=int(state["completed"]),
+            status=state["status"],
+            error=state["error"] or None,
+            created_at=float(state["created_at"]),
+        )
+
+
+class BulkExportService:
+    """
+    Renders many briefs in parallel across a process pool and packs them
+    into one ZIP. Jobs run in the background so callers can poll progress
+    and download the archive once it is ready.
+
+    Job state lives in Redis and archives in EXPORT_JOB_DIR, so with
+    several workers any of them can answer a poll or a download (the
+    directory must be shared between hosts). Without Redis, jobs are only
+    known to the worker that started them.
+    """
+
+    def __init__(self):
+        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.max_workers = int(os.getenv("EXPORT_WORKERS", "2"))
+        self.job_ttl = int(os.getenv("EXPORT_JOB_TTL", "3600"))
+        self.job_dir = os.getenv("EXPORT_JOB_DIR", os.path.join(BASE_DIR, "exports", "jobs"))
+        os.makedirs(self.job_dir, exist_ok=True)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, BulkExportJob] = {}
+        self._tasks: set = set()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"export:job:{job_id}"
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir, f"{job_id}.zip")
+
+    async def submit(self, briefs: List[Dict[str, Any]], format: str) -> BulkExportJob:
+        """Start rendering the given brief payloads and return the job"""
+        self._expire()
+
+        job = BulkExportJob(len(briefs), format)
+        await self._save(job)
+
+        task = asyncio.create_task(self._run(job, briefs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: BulkExportJob, briefs: List[Dict[str, Any]]):
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        extension = EXPORT_EXTENSIONS[job.format]
+        path = self._path(job.id)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        job.status = "running"
+        await self._save(job)
+
+        async def render(brief_data):
+            content = await loop.run_in_executor(pool, render_export, brief_data, job.format)
+            return brief_data["id"], content
+
+        try:
+            # PDFs and DOCX are already compressed; store them as-is
+            with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as archive:
+                for pending in asyncio.as_completed([render(b) for b in briefs]):
+                    brief_id, content = await pending
+                    await asyncio.to_thread(archive.writestr, f"brief_{brief_id}.{extension}", content)
+                    job.completed += 1
+                    await self._save(job)
+
+            os.replace(temp_path, path)
+            job.status = "completed"
+            await self._save(job)
+            logger.info(f"Bulk export {job.id} completed ({job.total} briefs)")
+        except Exception as e:
+            logger.exception(f"Bulk export {job.id} failed")
+            job.status = "failed"
+            job.error = str(e) or e.__class__.__name__
+            await self._save(job)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    async def get(self, job_id: str) -> Optional[BulkExportJob]:
+        redis_client = cache_service.redis_client
+        if redis_client is None:
+            return self._jobs.get(job_id)
+        try:
+            state = await redis_client.hgetall(self._key(job_id))
+        except Exception as e:
+            logger.error(f"Error reading export job {job_id}: {str(e)}")
+            return None
+        return BulkExportJob.from_state(job_id, state) if state else None
+
+    async def take_output(self, job_id: str) -> Optional[BinaryIO]:
+        """Hand over a finished archive; the job is forgotten afterwards"""
+        job = await self.get(job_id)
+        if not job or job.status != "completed":
+            return None
+
+        # Whichever worker removes the job record serves the one download
+        if not await self._forget(job_id):
+            return None
+
+        path = self._path(job_id)
+        try:
+            output = open(path, "rb")
+        except FileNotFoundError:
+            logger.error(f"Archive of export job {job_id} is missing from {self.job_dir}")
+            return None
+        os.remove(path)  # the open handle keeps it readable
+        return output
+
+    async def _save(self, job: BulkExportJob):
+        redis_client = cache_service.redis_client
+        if redis_client is None:
+            self._jobs[job.id] = job
+            return
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hset(self._key(job.id), mapping=job.to_state())
+            pipe.expire(self._key(job.id), self.job_ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error saving export job {job.id}: {str(e)}")
+
+    async def _forget(self, job_id: str) -> bool:
+        redis_client = cache_service.redis_client
+        if redis_client is None:
+            return self._jobs.pop(job_id, None) is not None
+        return await redis_client.delete(self._key(job_id)) > 0
+
+    def _expire(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.created_at < cutoff and job.status in ("completed", "failed"):
+                del self._jobs[job_id]
+
+        # Archives nobody downloaded, and leftovers of crashed jobs
+        for entry in os.scandir(self.job_dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+bulk_export_service = BulkExportService()
@@ -1,65 +1,218 @@
 import redis
+import redis.asyncio
 import json
 import os
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with a per-entry TTL.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_items: int, ttl: int):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
 class CacheService:
+    """
+    Redis cache for the request path.
+
+    `redis_client` is a redis.asyncio client, so every call is awaited on
+    the event loop instead of blocking it. The connection check at startup
+    and the L1 invalidation listener use a separate synchronous client.
+    """
+
     def __init__(self):
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
         try:
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
-            self.redis_client.ping()
+            self.sync_client = redis.from_url(redis_url, decode_responses=True)
+            self.sync_client.ping()
+            self.redis_client = redis.asyncio.from_url(redis_url, decode_responses=True)
             logger.info("Redis connection established")
         except Exception as e:
             logger.warning(f"Redis connection failed: {str(e)}. Caching disabled.")
+            self.sync_client = None
             self.redis_client = None
-    
-    def get(self, key: str) -> Optional[Any]:
+
+        # Optional in-process L1 in front of Redis
+        self.local_cache = None
+        self._listener = None
+        self._instance_id = uuid.uuid4().hex
+        if self.redis_client and os.getenv("CACHE_L1_ENABLED", "false").lower() == "true":
+            self.local_cache = LocalCache(
+                max_items=int(os.getenv("CACHE_L1_MAX_ITEMS", "1024")),
+                ttl=int(os.getenv("CACHE_L1_TTL", "5")),
+            )
+            self._start_invalidation_listener()
+
+    def _start_invalidation_listener(self):
+        """Drop L1 entries when any worker writes or deletes a key"""
+        try:
+            pubsub = self.sync_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidate})
+            self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener failed: {str(e)}. L1 cache disabled.")
+            self.local_cache = None
+
+    def _on_invalidate(self, message):
+        sender, _, key = message["data"].partition("|")
+        # Our own writes already updated the local L1
+        if self.local_cache and sender != self._instance_id:
+            self.local_cache.delete(key)
+
+    async def _write(self, key: str, command):
+        """Run a Redis write and broadcast the key to every worker's L1"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        command(pipe)
+        if self.local_cache:
+            self.local_cache.delete(key)
+            pipe.publish(INVALIDATION_CHANNEL, f"{self._instance_id}|{key}")
+        return (await pipe.execute())[0]
+
+    async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self.redis_client:
             return None
+        if self.local_cache:
+            value = self.local_cache.get(key)
+            if value is not None:
+                return value
         try:
-            value = self.redis_client.get(key)
+            value = await self.redis_client.get(key)
             if value:
-                return json.loads(value)
+                value = json.loads(value)
+                if self.local_cache:
+                    self.local_cache.set(key, value)
+                return value
             return None
         except Exception as e:
             logger.error(f"Error getting from cache: {str(e)}")
             return None
-    
-    def set(self, key: str, value: Any, ttl: int = 3600):
+
+    async def set(self, key: str, value: Any, ttl: int = 3600):
         """Set value in cache with TTL (default 1 hour)"""
         if not self.redis_client:
             return
         try:
-            self.redis_client.setex(key, ttl, json.dumps(value))
+            await self._write(key, lambda pipe: pipe.setex(key, ttl, json.dumps(value)))
+            if self.local_cache:
+                self.local_cache.set(key, value, ttl)
         except Exception as e:
             logger.error(f"Error setting cache: {str(e)}")
-    
-    def delete(self, key: str):
+
+    async def delete(self, key: str):
         """Delete key from cache"""
         if not self.redis_client:
             return
         try:
-            self.redis_client.delete(key)
+            await self._write(key, lambda pipe: pipe.delete(key))
         except Exception as e:
             logger.error(f"Error deleting from cache: {str(e)}")
-    
-    def clear_pattern(self, pattern: str):
-        """Clear all keys matching pattern"""
+
+    async def namespace_key(self, namespace: str, key: str) -> str:
+        """Build a key scoped to the current generation of a namespace"""
+        return f"{namespace}:g{await self._generation(namespace)}:{key}"
+
+    async def clear_namespace(self, namespace: str):
+        """Invalidate every key in a namespace by bumping its generation.
+
+        Entries written under older generations are never read again and
+        expire through their own TTL, so this is a single O(1) INCR.
+        """
         if not self.redis_client:
             return
+        generation_key = f"{namespace}:generation"
+        try:
+            await self._write(generation_key, lambda pipe: pipe.incr(generation_key))
+        except Exception as e:
+            logger.error(f"Error clearing cache namespace: {str(e)}")
+
+    async def _generation(self, namespace: str) -> int:
+        if not self.redis_client:
+            return 0
+        generation_key = f"{namespace}:generation"
+        if self.local_cache:
+            generation = self.local_cache.get(generation_key)
+            if generation is not None:
+                return generation
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
+            generation = int(await self.redis_client.get(generation_key) or 0)
+            if self.local_cache:
+                self.local_cache.set(generation_key, generation)
+            return generation
         except Exception as e:
-            logger.error(f"Error clearing cache pattern: {str(e)}")
+            logger.error(f"Error reading cache generation: {str(e)}")
+            return 0
+
+    async def close(self):
+        """Release the async client's connections (on application shutdown)"""
+        if self.redis_client:
+            await self.redis_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache availability and L1 counters for this worker"""
+        return {
+            "redis": self.redis_client is not None,
+            "l1": self.local_cache.stats() if self.local_cache else None,
+        }
 
 # Singleton instance
 cache_service = CacheService()
@@ -1,5 +1,14 @@
 from pathlib import Path
-from typing import Dict, Tuple
+from datetime import datetime, time
+from itertools import chain
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, NamedTuple, Optional
+from fastapi import Request
+from openpyxl import load_workbook
+from python_multipart.multipart import MultipartParser, parse_options_header
+from services.schema_service import schema_service, normalize_name
+import anyio
+import hashlib
 import mimetypes
 import pandas as pd
 import uuid
@@ -8,46 +17,289 @@ import os
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+EXTRACTABLE_TYPES = {"xlsx", "xls"}
+
+
+class FileTooLargeError(Exception):
+    pass
+
+
+class InvalidUploadError(Exception):
+    pass
+
+
+class SavedFile(NamedTuple):
+    path: str
+    temp_path: str
+    mime_type: str
+    size: int
+    sha256: str
+    deduplicated: bool
+
+
+def extract_text_content(file_path: str, file_type: str) -> Dict[str, str] | None:
+    """
+    Parse an uploaded spreadsheet into BRIEF_SCHEMA fields, keyed by inputName.
+    CPU-bound: runs in the extraction process pool, never on the event loop.
+    """
+    if file_type not in EXTRACTABLE_TYPES:
+        return None
+
+    if file_type == "xlsx":
+        # read_only streams rows from the zip instead of building the workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheets = (sheet.iter_rows(values_only=True) for sheet in workbook.worksheets)
+            extracted = _extract_fields(sheets)
+        finally:
+            workbook.close()
+    else:
+        # Legacy .xls is not supported by openpyxl
+        frames = pd.read_excel(file_path, sheet_name=None, header=None)
+        sheets = (df.itertuples(index=False, name=None) for df in frames.values())
+        extracted = _extract_fields(sheets)
+
+    return extracted or None
+
+
+def _extract_fields(sheets: Iterable[Iterator[tuple]]) -> Dict[str, str]:
+    """
+    Match sheet cells to schema fields, stopping once every field is found.
+
+    Two layouts are recognised per sheet:
+    - tabular: a header row of field names; values come from the first
+      non-empty row below it, and the rest of the sheet is skipped
+    - key/value: field name in the first column, value in the second
+    """
+    index = schema_service.field_index
+    remaining = set(index.values())
+    extracted: Dict[str, str] = {}
+
+    def take(field_name: str, value: Any):
+        if field_name in remaining and (text := _cell_text(value)):
+            extracted[field_name] = text
+            remaining.discard(field_name)
+
+    for rows in sheets:
+        header = next(rows, None)
+        if not header:
+            continue
+
+        columns = [
+            (i, index[key])
+            for i, cell in enumerate(header)
+            if (key := normalize_name(cell)) in index
+        ]
+
+        if len(columns) > 1:
+            for row in rows:
+                if any(_cell_text(v) for v in row):
+                    for i, field_name in columns:
+                        if i < len(row):
+                            take(field_name, row[i])
+                    break
+        else:
+            for row in chain([header], rows):
+                if len(row) > 1 and (key := normalize_name(row[0])) in index:
+                    take(index[key], row[1])
+                if not remaining:
+                    break
+
+        if not remaining:
+            break
+
+    return extracted
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN from pandas
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == time.min else value.isoformat()
+    return str(value).strip()
+
+
+class MultipartUpload:
+    """
+    Reads a multipart/form-data body off the request stream, so the file
+    part goes straight to save_upload() instead of being spooled to a temp
+    file by the form parser first. Other parts are skipped.
+    """
+
+    def __init__(self, request: Request):
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            raise FileTooLargeError(f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise InvalidUploadError("Expected a multipart/form-data body")
+
+        self._stream = request.stream()
+        self._events: deque = deque()
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    async def next_file(self, field: str = "file") -> str:
+        """Read up to the named file part and return its filename"""
+        while True:
+            kind, value = await self._next_event()
+            if kind == "eof":
+                raise InvalidUploadError(f"Missing file field '{field}'")
+            if kind == "file" and value[0] == field:
+                if not value[1]:
+                    raise InvalidUploadError("Filename is required")
+                return value[1]
+            # Anything else (other parts' data) is skipped
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """The current file part's bytes, as they arrive"""
+        while True:
+            kind, value = await self._next_event()
+            if kind == "data":
+                yield value
+            elif kind == "end":
+                return
+            elif kind == "eof":
+                raise InvalidUploadError("Upload ended before the file did")
+
+    async def _next_event(self):
+        while not self._events:
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                self._parser.finalize()
+                self._events.append(("eof", None))
+                break
+            self._parser.write(chunk)
+        return self._events.popleft()
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._in_file = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" in options:
+            self._in_file = True
+            name = options.get(b"name", b"").decode("latin-1")
+            self._events.append(("file", (name, options[b"filename"].decode("utf-8", "replace"))))
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._events.append(("data", bytes(data[start:end])))
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._events.append(("end", None))
+
+
 class DocumentService:
 
-    async def save_file(self, content: bytes, filename: str) -> Tuple[str, str]:
+    async def save_upload(self, chunks: AsyncIterator[bytes], filename: str) -> SavedFile:
+        """
+        Stream an upload to a temp file, hashing it on the way and stopping
+        as soon as it passes MAX_UPLOAD_SIZE. Writes are batched into
+        UPLOAD_CHUNK_SIZE blocks, which also bounds memory use whatever the
+        file size.
+
+        The file is stored content-addressed as uploads/<sha256>.<ext> by
+        store() once the document row referencing it is committed, or
+        dropped by discard() if that fails.
+        """
         ext = filename.rsplit(".", 1)[-1].lower()
-        safe_name = f"{uuid.uuid4()}.{ext}"
-        path = UPLOAD_DIR / safe_name
 
-        with open(path, "wb") as f:
-            f.write(content)
+        digest = hashlib.sha256()
+        size = 0
+        temp_path = UPLOAD_DIR / f".{uuid.uuid4()}.part"
 
-        mime_type, _ = mimetypes.guess_type(filename)
-        return str(path), mime_type or "application/octet-stream"
+        pending = bytearray()
 
-    async def extract_text_content(self, file_path: str, file_type: str) -> Dict[str, str] | None:
-        if file_type not in {"xlsx", "xls"}:
-            return None
-
-        df = pd.read_excel(file_path)
+        try:
+            async with await anyio.open_file(temp_path, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > MAX_UPLOAD_SIZE:
+                        raise FileTooLargeError(
+                            f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit"
+                        )
+                    digest.update(chunk)
+                    pending += chunk
+                    if len(pending) >= UPLOAD_CHUNK_SIZE:
+                        await f.write(pending)
+                        pending.clear()
+                await f.write(pending)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
 
-        if df.empty:
-            return None
+        sha256 = digest.hexdigest()
+        path = UPLOAD_DIR / f"{sha256}.{ext}"
 
-        row = df.iloc[0]
+        mime_type, _ = mimetypes.guess_type(filename)
+        return SavedFile(
+            path=str(path),
+            temp_path=str(temp_path),
+            mime_type=mime_type or "application/octet-stream",
+            size=size,
+            sha256=sha256,
+            deduplicated=path.exists(),
+        )
 
-        # Explicit mapping from Excel → section fields
-        FIELD_MAP = {
-            "Executive Sponsor": "Executive Sponsor",
-            "Event SPOC": "Event SPOC",
-            "Content Lead": "Content Lead",
-            "Demand Strategist": "Demand Strategist",
-            "Field Marketer": "Field Marketer",
-        }
+    def store(self, saved: SavedFile) -> None:
+        """Move an upload into place, unless the same bytes are already stored"""
+        if os.path.exists(saved.path):
+            os.remove(saved.temp_path)
+        else:
+            # Atomic: concurrent uploads of the same bytes converge on one file
+            os.replace(saved.temp_path, saved.path)
 
-        extracted: Dict[str, str] = {}
+    def discard(self, saved: SavedFile) -> None:
+        Path(saved.temp_path).unlink(missing_ok=True)
 
-        for excel_col, field_name in FIELD_MAP.items():
-            if excel_col in row and pd.notna(row[excel_col]):
-                extracted[field_name] = str(row[excel_col]).strip()
+    def retire_file(self, path: str) -> Optional[str]:
+        """Move a stored file aside; restore_file() puts it back, delete_file() removes it"""
+        retired = str(UPLOAD_DIR / f".{uuid.uuid4()}.deleted")
+        try:
+            os.replace(path, retired)
+        except FileNotFoundError:
+            return None
+        return retired
 
-        return extracted
+    def restore_file(self, retired: str, path: str) -> None:
+        os.replace(retired, path)
 
     def delete_file(self, path: str) -> None:
         if os.path.exists(path):
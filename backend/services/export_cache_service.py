@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+import uuid
+import logging
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+EXPORT_EXTENSIONS = {"pdf": "pdf", "word": "docx"}
+
+# Temp files of renders still being written; older ones were left by a crash
+PART_SUFFIX = ".part"
+STALE_PART_AGE = 3600
+
+
+class ExportCacheService:
+    """
+    Rendered exports on local disk, keyed by brief id, content fingerprint
+    and format. Size-bounded with least-recently-used eviction (file mtime
+    is bumped on every hit).
+    """
+
+    def __init__(self):
+        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.cache_dir = os.path.join(BASE_DIR, "exports", "cache")
+        self.max_bytes = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, brief_id: str, fingerprint: str, format: str) -> str:
+        return os.path.join(self.cache_dir, f"{brief_id}_{fingerprint}.{EXPORT_EXTENSIONS[format]}")
+
+    def get(self, brief_id: str, fingerprint: str, format: str) -> Optional[str]:
+        path = self._path(brief_id, fingerprint, format)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def put(self, brief_id: str, fingerprint: str, format: str, rendered: BinaryIO) -> str:
+        """Persist a freshly rendered export; the buffer is rewound afterwards"""
+        path = self._path(brief_id, fingerprint, format)
+        temp_path = f"{path}.{uuid.uuid4().hex}{PART_SUFFIX}"
+
+        try:
+            with open(temp_path, "wb") as f:
+                shutil.copyfileobj(rendered, f)
+            os.replace(temp_path, path)
+        finally:
+            rendered.seek(0)
+            self._remove(temp_path)
+
+        # Renders of older fingerprints can never be hit again
+        self.invalidate(brief_id, keep_fingerprint=fingerprint)
+        self._evict(keep=path)
+        return path
+
+    def invalidate(self, brief_id: str, keep_fingerprint: Optional[str] = None):
+        prefix = f"{brief_id}_"
+        current = f"{brief_id}_{keep_fingerprint}."
+        for entry in os.scandir(self.cache_dir):
+            # A concurrent put() still owns its temp file and renames it later
+            if entry.name.endswith(PART_SUFFIX):
+                continue
+            if entry.name.startswith(prefix) and not entry.name.startswith(current):
+                self._remove(entry.path)
+
+    def _evict(self, keep: str):
+        entries = []
+        stale_before = time.time() - STALE_PART_AGE
+        for entry in os.scandir(self.cache_dir):
+            if entry.path == keep:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(PART_SUFFIX):
+                if stat.st_mtime < stale_before:
+                    self._remove(entry.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = os.path.getsize(keep) + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            logger.info("Evicted cached export %s", path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+export_cache_service = ExportCacheService()
@@ -1,61 +1,488 @@
-import os
+import io
+import json
 import logging
-from typing import Dict, Any
+import tempfile
+from typing import Dict, Any, BinaryIO, Iterator, List, NamedTuple, Optional, Union
+from docx import Document as DocxDocument
+from docx.shared import Pt
 from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 
+from services.schema_service import schema_service
+
 logger = logging.getLogger(__name__)
 
+# Renders stay in memory up to this size, then spill to an anonymous temp file
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
 
-class ExportService:
-    def __init__(self):
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.export_dir = os.path.join(BASE_DIR, "exports")
-        os.makedirs(self.export_dir, exist_ok=True)
+# Part of every export cache key: bump whenever a change to the layout or
+# the renderers changes their output, so cached renders are not reused
+EXPORT_LAYOUT_VERSION = 2
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "word": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def new_export_buffer() -> BinaryIO:
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+
+def iter_file(fileobj: BinaryIO) -> Iterator[bytes]:
+    """Stream a file object in chunks and close it when done"""
+    with fileobj:
+        while chunk := fileobj.read(STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+# --------------------------------------------------
+# Layout model shared by the PDF and DOCX renderers
+# --------------------------------------------------
+
+class Table(NamedTuple):
+    headers: List[str]
+    rows: List[List[str]]
+
+
+class LayoutField(NamedTuple):
+    label: str
+    kind: str  # "text", "list" or "table"
+    value: Union[str, List[str], Table]
+
+
+class LayoutGroup(NamedTuple):
+    heading: Optional[str]
+    fields: List[LayoutField]
+
+
+class LayoutSection(NamedTuple):
+    heading: str
+    groups: List[LayoutGroup]
+
+
+class BriefLayout(NamedTuple):
+    title: str
+    meta: List[LayoutField]
+    sections: List[LayoutSection]
+
+
+def _parse_json(value: str) -> Any:
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _layout_field(label: str, value: Any, data_type: Optional[str] = None) -> Optional[LayoutField]:
+    # Section content is stored as strings; arrays and objects as JSON text
+    if isinstance(value, str):
+        value = _parse_json(value.strip())
+
+    if value in (None, "", [], {}):
+        return None
+
+    if isinstance(value, dict):
+        return LayoutField(label, "table", Table(["Item", "Value"], [[str(k), _text(v)] for k, v in value.items()]))
 
-    def export_to_pdf(self, brief_data: Dict[str, Any], filename: str | None = None) -> str:
-        if not filename:
-            filename = f"brief_{brief_data.get('id', 'export')}.pdf"
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            headers = list(dict.fromkeys(key for item in value for key in item))
+            if not headers:
+                return None  # only empty objects
+            rows = [[_text(item.get(h)) for h in headers] for item in value]
+            return LayoutField(label, "table", Table([str(h) for h in headers], rows))
+        return LayoutField(label, "list", [_text(item) for item in value])
 
-        file_path = os.path.join(self.export_dir, filename)
+    text = str(value)
+    if data_type == "Array" and "\n" in text:
+        return LayoutField(label, "list", [line.strip() for line in text.splitlines() if line.strip()])
+    return LayoutField(label, "text", text)
 
-        c = canvas.Canvas(file_path, pagesize=A4)
-        width, height = A4
-        y_position = height - inch
 
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(inch, y_position, brief_data.get("title", "Event Brief"))
-        y_position -= inch
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
 
-        c.setFont("Helvetica", 11)
 
-        for section in brief_data.get("sections", []):
-            if y_position < inch:
-                c.showPage()
-                y_position = height - inch
-                c.setFont("Helvetica", 11)
+def build_layout(brief_data: Dict[str, Any]) -> BriefLayout:
+    """Arrange a brief's section content under the BRIEF_SCHEMA headings"""
+    meta = [
+        _layout_field(label, brief_data.get(key))
+        for label, key in (
+            ("Event type", "event_type"),
+            ("Status", "status"),
+            ("Version", "version"),
+            ("Created", "created_at"),
+        )
+    ]
 
-            c.setFont("Helvetica-Bold", 13)
-            c.drawString(inch, y_position, section.get("section_name", ""))
-            y_position -= 0.4 * inch
+    sections = []
+    for section in brief_data.get("sections", []):
+        content = section.get("content") or {}
+        schema_section = schema_service.section_index.get(section.get("section_number"), {})
+        groups = []
+        placed = set()
 
-            c.setFont("Helvetica", 11)
-            content = section.get("content", {})
+        for group in schema_section.get("inputFields", []):
+            fields = []
+            for field in group["fields"]:
+                name = field["inputName"]
+                placed.add(name)
+                if name in content:
+                    laid_out = _layout_field(name, content[name], field.get("dataType"))
+                    if laid_out:
+                        fields.append(laid_out)
+            if fields:
+                groups.append(LayoutGroup(group.get("fieldsHeading"), fields))
 
-            if isinstance(content, dict):
-                for key, value in content.items():
-                    c.drawString(inch, y_position, f"{key}: {value}")
-                    y_position -= 0.3 * inch
+        # Keys the schema doesn't know about (custom fields) go last
+        if isinstance(content, dict):
+            extra = [_layout_field(k, v) for k, v in content.items() if k not in placed]
+            extra = [f for f in extra if f]
+        else:
+            extra = [_layout_field("Content", content)]
+        if extra:
+            groups.append(LayoutGroup(None, extra))
+
+        sections.append(LayoutSection(section.get("section_name", ""), groups))
+
+    return BriefLayout(
+        brief_data.get("title") or "Event Brief",
+        [f for f in meta if f],
+        sections,
+    )
+
+
+# --------------------------------------------------
+# PDF text measurement and flow
+# --------------------------------------------------
+
+# font name -> {char: width in 1/1000 em}, filled lazily
+_font_widths: Dict[str, Dict[str, float]] = {}
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    widths = _font_widths.setdefault(font, {})
+    total = 0.0
+    for ch in text:
+        width = widths.get(ch)
+        if width is None:
+            width = widths[ch] = pdfmetrics.stringWidth(ch, font, 1000)
+        total += width
+    return total * size / 1000
+
+
+def wrap_text(text: str, font: str, size: float, max_width: float) -> List[str]:
+    """Greedy word wrap; words wider than a line are split by character"""
+    space = text_width(" ", font, size)
+    lines: List[str] = []
+
+    for paragraph in str(text).splitlines() or [""]:
+        line, line_width = "", 0.0
+        start = len(lines)
+
+        for word in paragraph.split():
+            word_width = text_width(word, font, size)
+
+            while word_width > max_width:
+                if line:
+                    lines.append(line)
+                    line, line_width = "", 0.0
+                cut = len(word) - 1
+                while cut > 1 and text_width(word[:cut], font, size) > max_width:
+                    cut -= 1
+                # A line always holds at least one character, however narrow
+                cut = max(cut, 1)
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = text_width(word, font, size)
+
+            if not word:
+                continue
+
+            if line and line_width + space + word_width > max_width:
+                lines.append(line)
+                line, line_width = "", 0.0
+
+            if line:
+                line += " " + word
+                line_width += space + word_width
             else:
-                c.drawString(inch, y_position, str(content))
-                y_position -= 0.3 * inch
+                line, line_width = word, word_width
+
+        # Empty paragraphs keep their blank line
+        if line or len(lines) == start:
+            lines.append(line)
+
+    return lines
+
+
+class _PdfFlow:
+    """Top-to-bottom text flow across A4 pages"""
+
+    MARGIN = 0.75 * inch
+    BODY_FONT = "Helvetica"
+    BOLD_FONT = "Helvetica-Bold"
+    BODY_SIZE = 10
+    LEADING = 13
+    CELL_PADDING = 3
+    MIN_COLUMN_WIDTH = 36
+
+    def __init__(self, output: BinaryIO):
+        self.canvas = canvas.Canvas(output, pagesize=A4)
+        self.page_width, self.page_height = A4
+        self.width = self.page_width - 2 * self.MARGIN
+        self.y = self.page_height - self.MARGIN
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.y = self.page_height - self.MARGIN
+
+    def ensure(self, height: float):
+        if self.y - height < self.MARGIN:
+            self.new_page()
 
-            y_position -= 0.2 * inch
+    def space(self, height: float):
+        self.y -= height
 
-        c.save()
-        logger.info("PDF exported to %s", file_path)
-        return file_path
+    def heading(self, text: str, size: float, keep_with: float = 0):
+        leading = size * 1.3
+        lines = wrap_text(text, self.BOLD_FONT, size, self.width)
+        # Never strand a heading at the bottom of a page
+        self.ensure(leading * len(lines) + keep_with)
+        self.canvas.setFont(self.BOLD_FONT, size)
+        for line in lines:
+            self.y -= leading
+            self.canvas.drawString(self.MARGIN, self.y, line)
+
+    def paragraph(self, text: str, indent: float = 0, font: Optional[str] = None, prefix: str = ""):
+        font = font or self.BODY_FONT
+        x = self.MARGIN + indent
+        prefix_width = text_width(prefix, font, self.BODY_SIZE)
+        lines = wrap_text(text, font, self.BODY_SIZE, self.width - indent - prefix_width)
+
+        self.canvas.setFont(font, self.BODY_SIZE)
+        for i, line in enumerate(lines):
+            self.ensure(self.LEADING)
+            self.y -= self.LEADING
+            if prefix and i == 0:
+                self.canvas.drawString(x, self.y, prefix)
+            self.canvas.drawString(x + prefix_width, self.y, line)
+            self.canvas.setFont(font, self.BODY_SIZE)
+
+    def table(self, table: Table, indent: float = 0):
+        width = self.width - indent
+        columns = len(table.headers)
+        pad = self.CELL_PADDING
+
+        if not columns:
+            return
+
+        if width / columns < self.MIN_COLUMN_WIDTH:
+            # Too many columns to sit side by side: one Field/Value table per row
+            for row in table.rows:
+                self.table(
+                    Table(["Field", "Value"], [[h, row[c] if c < len(row) else ""] for c, h in enumerate(table.headers)]),
+                    indent,
+                )
+                self.space(4)
+            return
+
+        # Columns get width in proportion to their longest content, with a floor
+        natural = [
+            max([text_width(table.headers[c], self.BOLD_FONT, self.BODY_SIZE)]
+                + [text_width(row[c], self.BODY_FONT, self.BODY_SIZE) for row in table.rows if c < len(row)])
+            + 2 * pad
+            for c in range(columns)
+        ]
+        floor = min(width / columns, 60)
+        extra = sum(natural) - width
+        if extra > 0:
+            shrinkable = sum(n - floor for n in natural if n > floor) or 1
+            col_widths = [n if n <= floor else n - extra * (n - floor) / shrinkable for n in natural]
+        else:
+            col_widths = natural
+
+        def layout_row(cells, font):
+            wrapped = [wrap_text(cells[c] if c < len(cells) else "", font, self.BODY_SIZE, col_widths[c] - 2 * pad)
+                       for c in range(columns)]
+            return wrapped, max(len(w) for w in wrapped) * self.LEADING + 2 * pad
+
+        header = layout_row(table.headers, self.BOLD_FONT)
+
+        def draw_row(wrapped, height, font):
+            self.canvas.setFont(font, self.BODY_SIZE)
+            x = self.MARGIN + indent
+            for c, lines in enumerate(wrapped):
+                self.canvas.rect(x, self.y - height, col_widths[c], height, stroke=1, fill=0)
+                ty = self.y - pad
+                for line in lines:
+                    ty -= self.LEADING
+                    self.canvas.drawString(x + pad, ty + 3, line)
+                x += col_widths[c]
+            self.y -= height
+
+        self.ensure(header[1] + self.LEADING + 2 * pad)
+        draw_row(*header, self.BOLD_FONT)
+
+        for row in table.rows:
+            wrapped, height = layout_row(row, self.BODY_FONT)
+            if self.y - height < self.MARGIN:
+                # Rows never split; the header repeats on the new page
+                self.new_page()
+                draw_row(*header, self.BOLD_FONT)
+            draw_row(wrapped, height, self.BODY_FONT)
+
+    def save(self):
+        self.canvas.save()
+
+
+# --------------------------------------------------
+# DOCX template, compiled once per process
+# --------------------------------------------------
+
+_docx_template: Optional[bytes] = None
+
+
+def _compile_docx_template() -> bytes:
+    document = DocxDocument()
+
+    normal = document.styles["Normal"]
+    normal.font.name = "Calibri"
+    normal.font.size = Pt(10.5)
+    normal.paragraph_format.space_after = Pt(4)
+
+    for name, size in (("Title", 22), ("Heading 1", 15), ("Heading 2", 12)):
+        document.styles[name].font.size = Pt(size)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _docx_document() -> DocxDocument:
+    global _docx_template
+    if _docx_template is None:
+        _docx_template = _compile_docx_template()
+    return DocxDocument(io.BytesIO(_docx_template))
+
+
+class ExportService:
+
+    def export_to_pdf(self, brief_data: Dict[str, Any]) -> BinaryIO:
+        """Render a brief to PDF into a spooled buffer, rewound for reading"""
+        layout = build_layout(brief_data)
+        output = new_export_buffer()
+        flow = _PdfFlow(output)
+        indent = 0.15 * inch
+
+        flow.heading(layout.title, 18)
+        for field in layout.meta:
+            flow.paragraph(f"{field.label}: {field.value}")
+        flow.space(flow.LEADING)
+
+        for section in layout.sections:
+            flow.heading(section.heading, 14, keep_with=2 * flow.LEADING)
+            flow.space(4)
+
+            if not section.groups:
+                flow.paragraph("No content")
+
+            for group in section.groups:
+                if group.heading:
+                    flow.heading(group.heading, 11.5, keep_with=2 * flow.LEADING)
+
+                for field in group.fields:
+                    if field.kind == "text":
+                        flow.paragraph(f"{field.label}:", font=flow.BOLD_FONT)
+                        flow.paragraph(field.value, indent=indent)
+                    elif field.kind == "list":
+                        flow.paragraph(f"{field.label}:", font=flow.BOLD_FONT)
+                        for item in field.value:
+                            flow.paragraph(item, indent=indent, prefix="\u2022 ")
+                    else:
+                        flow.paragraph(f"{field.label}:", font=flow.BOLD_FONT)
+                        flow.space(2)
+                        flow.table(field.value, indent=indent)
+                    flow.space(4)
+
+            flow.space(flow.LEADING)
+
+        flow.save()
+        output.seek(0)
+        logger.info("PDF rendered for brief %s", brief_data.get("id"))
+        return output
+
+    def export_to_word(self, brief_data: Dict[str, Any]) -> BinaryIO:
+        """Render a brief to DOCX into a spooled buffer, rewound for reading"""
+        layout = build_layout(brief_data)
+        document = _docx_document()
+
+        document.add_heading(layout.title, level=0)
+        for field in layout.meta:
+            paragraph = document.add_paragraph()
+            paragraph.add_run(f"{field.label}: ").bold = True
+            paragraph.add_run(field.value)
+
+        for section in layout.sections:
+            document.add_heading(section.heading, level=1)
+
+            if not section.groups:
+                document.add_paragraph("No content")
+
+            for group in section.groups:
+                if group.heading:
+                    document.add_heading(group.heading, level=2)
+
+                for field in group.fields:
+                    paragraph = document.add_paragraph()
+                    paragraph.add_run(field.label).bold = True
+
+                    if field.kind == "text":
+                        paragraph.add_run(f": {field.value}")
+                    elif field.kind == "list":
+                        for item in field.value:
+                            document.add_paragraph(item, style="List Bullet")
+                    else:
+                        self._add_docx_table(document, field.value)
+
+        output = new_export_buffer()
+        document.save(output)
+        output.seek(0)
+        logger.info("DOCX rendered for brief %s", brief_data.get("id"))
+        return output
+
+    @staticmethod
+    def _add_docx_table(document: DocxDocument, table: Table):
+        grid = document.add_table(rows=len(table.rows) + 1, cols=len(table.headers))
+        grid.style = "Table Grid"
+
+        for cell, header in zip(grid.rows[0].cells, table.headers):
+            cell.paragraphs[0].add_run(header).bold = True
+
+        for grid_row, row in zip(grid.rows[1:], table.rows):
+            for cell, value in zip(grid_row.cells, row):
+                cell.text = value
 
 
 export_service = ExportService()
+
+
+def render_export(brief_data: Dict[str, Any], format: str) -> bytes:
+    """Render a brief and return the document bytes (safe to run in a worker process)"""
+    if format == "pdf":
+        output = export_service.export_to_pdf(brief_data)
+    else:
+        output = export_service.export_to_word(brief_data)
+
+    with output:
+        return output.read()
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, bindparam, not_, select, update
+
+from database import AsyncSessionLocal
+from models import Document, ExtractionStatus
+from services.cache_service import cache_service
+from services.document_service import extract_text_content
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionService:
+    """
+    Background queue that parses uploaded documents in a bounded process
+    pool, so spreadsheet parsing never blocks the API's event loop.
+
+    Several API workers share the documents table, so a job only runs
+    once its worker has claimed it with a conditional UPDATE. A claim
+    older than the extraction timeout belongs to a worker that died.
+    """
+
+    def __init__(self):
+        self.max_workers = int(os.getenv("EXTRACTION_WORKERS", "2"))
+        self.timeout = int(os.getenv("EXTRACTION_TIMEOUT", "120"))
+        # A claimed job finishes or fails within the timeout; allow some slack
+        self.claim_ttl = timedelta(seconds=self.timeout + 60)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self._recent = deque(maxlen=100)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._executor
+
+    def submit(self, document_id: str, file_path: str, file_type: str):
+        """Queue a document for extraction and return immediately"""
+        self._pool()
+        self.queued += 1
+        task = asyncio.create_task(self._run(document_id, file_path, file_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, document_id: str, file_path: str, file_type: str):
+        enqueued_at = time.perf_counter()
+
+        async with self._slots:
+            self.queued -= 1
+
+            claimed_at = datetime.utcnow()
+            claimed = await self._set_status(
+                document_id,
+                self._claimable(),
+                status=ExtractionStatus.PROCESSING.value,
+                extraction_started_at=claimed_at,
+            )
+            if not claimed:
+                # Finished, or being run by another worker
+                self.skipped += 1
+                logger.info(f"Extraction for document {document_id} already claimed")
+                return
+
+            self.running += 1
+            started_at = time.perf_counter()
+
+            try:
+                loop = asyncio.get_running_loop()
+                extracted = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, extract_text_content, file_path, file_type),
+                    timeout=self.timeout,
+                )
+                # Only while the claim is still ours
+                await self._set_status(
+                    document_id,
+                    Document.extraction_started_at == claimed_at,
+                    status=ExtractionStatus.COMPLETED.value,
+                    extracted_content=extracted,
+                )
+                self.completed += 1
+                outcome = ExtractionStatus.COMPLETED.value
+            except Exception as e:
+                logger.exception(f"Extraction failed for document {document_id}")
+                await self._set_status(
+                    document_id,
+                    Document.extraction_started_at == claimed_at,
+                    status=ExtractionStatus.FAILED.value,
+                    extraction_error=str(e) or e.__class__.__name__,
+                )
+                self.failed += 1
+                outcome = ExtractionStatus.FAILED.value
+            finally:
+                self.running -= 1
+
+        finished_at = time.perf_counter()
+        self._recent.append({
+            "document_id": document_id,
+            "status": outcome,
+            "wait_ms": round((started_at - enqueued_at) * 1000, 1),
+            "run_ms": round((finished_at - started_at) * 1000, 1),
+        })
+        logger.info(f"Extraction {outcome} for document {document_id}")
+
+    def _claimable(self):
+        """Pending jobs, and processing jobs whose claim has lapsed"""
+        cutoff = datetime.utcnow() - self.claim_ttl
+        unfinished = [ExtractionStatus.PENDING.value, ExtractionStatus.PROCESSING.value]
+        return and_(
+            # Inlined, not bound: the planner must see that the partial index applies
+            Document.extraction_status.in_(
+                bindparam("unfinished", unfinished, expanding=True, literal_execute=True)
+            ),
+            not_(and_(
+                Document.extraction_status == ExtractionStatus.PROCESSING.value,
+                Document.extraction_started_at.isnot(None),
+                Document.extraction_started_at >= cutoff,
+            )),
+        )
+
+    async def _set_status(self, document_id: str, *conditions, status: str, **values) -> bool:
+        """Update a job's row if it (still) matches `conditions`; False if it didn't"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Document)
+                .where(Document.id == document_id, *conditions)
+                .values(extraction_status=status, **values)
+                .returning(Document.brief_id)
+            )
+            brief_id = result.scalar_one_or_none()
+            await db.commit()
+
+        if brief_id:
+            await cache_service.delete(f"briefs:{brief_id}:full")
+        return brief_id is not None
+
+    async def resume_pending(self):
+        """
+        Requeue documents no live worker is running: still pending, or
+        processing under a lapsed claim. Each job is claimed when it
+        starts, so a job requeued by two workers still runs once.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Document.id, Document.file_path, Document.file_type).where(self._claimable())
+            )
+            pending = result.all()
+
+        for document_id, file_path, file_type in pending:
+            self.submit(document_id, file_path, file_type)
+
+        if pending:
+            logger.info(f"Requeued {len(pending)} pending extraction(s)")
+
+    def stats(self) -> Dict[str, Any]:
+        recent = list(self._recent)
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "avg_wait_ms": round(sum(j["wait_ms"] for j in recent) / len(recent), 1) if recent else None,
+            "avg_run_ms": round(sum(j["run_ms"] for j in recent) / len(recent), 1) if recent else None,
+            "recent_jobs": recent[-10:],
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+extraction_service = ExtractionService()
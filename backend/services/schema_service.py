@@ -0,0 +1,184 @@
+import hashlib
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from brief_schema import BRIEF_SCHEMA
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Spreadsheet headers seen in client event exports -> inputName
+HEADER_ALIASES = {
+    "Event Name": "Project Name",
+    "Event Name (English)": "Project Name",
+    "EMB #": "EMB",
+    "Start Date": "Event date",
+    "Event Start Date": "Event date",
+    "Landing City": "City",
+    "Event Website": "Website",
+    "Event Producer": "Producer",
+    "Global Event Tier": "Event Tier",
+    "Execution Cost": "Forecasted Budget",
+    "Budget": "Forecasted Budget",
+    "Location": "Venue",
+}
+
+
+# Placeholders the AI prompts are told to answer with when nothing is found
+EMPTY_VALUES = {"", "nil"}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d %B %Y", "%B %d, %Y", "%d-%b-%Y")
+
+Validator = Callable[[Any], Optional[str]]
+
+
+def normalize_name(name: Any) -> str:
+    """Case/punctuation-insensitive key for matching headers to fields"""
+    if name is None:
+        return ""
+    return _NON_ALNUM.sub("", str(name).lower())
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and value.strip().lower() in EMPTY_VALUES)
+
+
+def _validate_string(value: Any) -> Optional[str]:
+    if isinstance(value, (dict, list)):
+        return "must be text"
+    return None
+
+
+def _validate_date(value: Any) -> Optional[str]:
+    if isinstance(value, (date, datetime)):
+        return None
+    if not isinstance(value, str):
+        return "must be a date"
+    text = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(text, fmt)
+            return None
+        except ValueError:
+            continue
+    return "must be a date (e.g. 2025-03-14)"
+
+
+def _validate_array(value: Any) -> Optional[str]:
+    if isinstance(value, (list, str)):
+        return None
+    return "must be a list or text"
+
+
+def _validate_object(value: Any) -> Optional[str]:
+    if isinstance(value, (dict, list, str)):
+        return None
+    return "must be an object, a list of objects or text"
+
+
+DATA_TYPE_VALIDATORS: Dict[str, Validator] = {
+    "String": _validate_string,
+    "Date": _validate_date,
+    "Array": _validate_array,
+    "Object": _validate_object,
+}
+
+
+def _compile_validator(field: Dict[str, Any], options: Optional[FrozenSet[str]]) -> Validator:
+    type_check = DATA_TYPE_VALIDATORS.get(field.get("dataType"), _validate_string)
+
+    def validate(value: Any) -> Optional[str]:
+        if _is_empty(value):
+            return None
+        error = type_check(value)
+        if error is None and options is not None and str(value) not in options:
+            error = f"must be one of: {', '.join(sorted(options))}"
+        return error
+
+    return validate
+
+
+class SchemaService:
+    """
+    BRIEF_SCHEMA compiled once into lookup structures, per-field
+    validators and the serialized payload served by GET /api/schema.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.sections: List[Dict[str, Any]] = schema["sections"]
+        self.section_index: Dict[int, Dict[str, Any]] = {
+            section["sectionNumber"]: section for section in self.sections
+        }
+
+        # Every input field, in schema order, tagged with its section
+        self.fields: List[Dict[str, Any]] = [
+            {**field, "sectionNumber": section["sectionNumber"]}
+            for section in self.sections
+            for group in section["inputFields"]
+            for field in group["fields"]
+        ]
+
+        # normalized header -> inputName
+        self.field_index: Dict[str, str] = {
+            normalize_name(alias): input_name
+            for alias, input_name in HEADER_ALIASES.items()
+        }
+        self.field_index.update({
+            normalize_name(field["inputName"]): field["inputName"]
+            for field in self.fields
+        })
+
+        # normalized section name -> section
+        self.section_name_index: Dict[str, Dict[str, Any]] = {
+            normalize_name(section["sectionName"]): section for section in self.sections
+        }
+
+        # (sectionNumber, inputName) -> field; a few inputNames recur across sections
+        self.field_lookup: Dict[Tuple[int, str], Dict[str, Any]] = {
+            (field["sectionNumber"], field["inputName"]): field for field in self.fields
+        }
+        self.fields_by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for field in self.fields:
+            self.fields_by_name.setdefault(field["inputName"], []).append(field)
+
+        # (sectionNumber, inputName) -> allowed values, dropdowns only
+        self.options: Dict[Tuple[int, str], FrozenSet[str]] = {
+            key: frozenset(field.get("options", []))
+            for key, field in self.field_lookup.items()
+            if field.get("fieldType") == "dropdown"
+        }
+
+        self.validators: Dict[Tuple[int, str], Validator] = {
+            key: _compile_validator(field, self.options.get(key))
+            for key, field in self.field_lookup.items()
+        }
+
+        self.payload: bytes = json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = f'"{hashlib.sha256(self.payload).hexdigest()[:32]}"'
+
+    def section(self, number: int) -> Optional[Dict[str, Any]]:
+        return self.section_index.get(number)
+
+    def section_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.section_name_index.get(normalize_name(name))
+
+    def field(self, input_name: str, section_number: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if section_number is not None:
+            return self.field_lookup.get((section_number, input_name))
+        matches = self.fields_by_name.get(input_name)
+        return matches[0] if matches else None
+
+    def validate_content(self, section_number: int, content: Dict[str, Any]) -> Dict[str, str]:
+        """Errors keyed by inputName; keys outside the schema are custom fields and pass"""
+        errors = {}
+        for key, value in content.items():
+            validator = self.validators.get((section_number, key))
+            error = validator(value) if validator else None
+            if error:
+                errors[key] = error
+        return errors
+
+
+schema_service = SchemaService(BRIEF_SCHEMA)
@@ -0,0 +1,148 @@
+import copy
+import os
+from typing import Any, Dict, List, Tuple
+
+BRIEF_FIELDS = ("title", "event_type", "status", "brief_metadata")
+SECTION_MAPS = ("content", "ai_generated")
+
+Path = Tuple[Any, ...]
+
+
+def flatten(snapshot: Dict[str, Any]) -> Dict[Path, Any]:
+    """
+    Snapshot -> {path: value} at field granularity:
+    ("title",), ("sections", n, "section_name"), ("sections", n, "content", field), ...
+    """
+    flat: Dict[Path, Any] = {}
+
+    for name in BRIEF_FIELDS:
+        if name in snapshot:
+            flat[(name,)] = snapshot[name]
+
+    for section in snapshot.get("sections", []):
+        number = section["section_number"]
+        flat[("sections", number, "section_name")] = section.get("section_name")
+        for name in SECTION_MAPS:
+            for key, value in (section.get(name) or {}).items():
+                flat[("sections", number, name, key)] = value
+
+    return flat
+
+
+def unflatten(flat: Dict[Path, Any]) -> Dict[str, Any]:
+    snapshot: Dict[str, Any] = {}
+    sections: Dict[int, Dict[str, Any]] = {}
+
+    for path, value in flat.items():
+        if path[0] != "sections":
+            snapshot[path[0]] = value
+            continue
+
+        number = path[1]
+        section = sections.setdefault(number, {
+            "section_number": number,
+            "section_name": None,
+            "content": {},
+            "ai_generated": {},
+        })
+        if path[2] == "section_name":
+            section["section_name"] = value
+        else:
+            section[path[2]][path[3]] = value
+
+    snapshot["sections"] = [sections[n] for n in sorted(sections)]
+    return snapshot
+
+
+def apply_delta(flat: Dict[Path, Any], delta: Dict[str, List]) -> Dict[Path, Any]:
+    for path in delta.get("unset", []):
+        flat.pop(tuple(path), None)
+    for path, value in delta.get("set", []):
+        flat[tuple(path)] = value
+    return flat
+
+
+class VersionService:
+    """
+    Brief versions as field-level deltas against the previous version,
+    with a full checkpoint snapshot every `checkpoint_interval` versions.
+    """
+
+    def __init__(self):
+        self.checkpoint_interval = int(os.getenv("VERSION_CHECKPOINT_INTERVAL", "20"))
+
+    def is_checkpoint(self, version_number: int, has_previous: bool) -> bool:
+        return not has_previous or version_number % self.checkpoint_interval == 0
+
+    def compute_delta(self, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List]:
+        """Field-level changes that turn `old` into `new`"""
+        old_flat = flatten(old)
+        new_flat = flatten(new)
+
+        return {
+            "set": [[list(path), value] for path, value in new_flat.items()
+                    if path not in old_flat or old_flat[path] != value],
+            "unset": [list(path) for path in old_flat if path not in new_flat],
+        }
+
+    def diff(self, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Changed fields only, grouped per section; identical sections are skipped whole"""
+        brief_changes = {
+            name: {"from": old.get(name), "to": new.get(name)}
+            for name in BRIEF_FIELDS
+            if old.get(name) != new.get(name)
+        }
+
+        old_sections = {s["section_number"]: s for s in old.get("sections", [])}
+        new_sections = {s["section_number"]: s for s in new.get("sections", [])}
+        sections = []
+
+        for number in sorted(old_sections.keys() | new_sections.keys()):
+            before = old_sections.get(number)
+            after = new_sections.get(number)
+
+            if before == after:
+                continue
+
+            if before is None or after is None:
+                present = after or before
+                sections.append({
+                    "section_number": number,
+                    "section_name": present.get("section_name"),
+                    "status": "added" if before is None else "removed",
+                    "changes": {},
+                })
+                continue
+
+            changes = {}
+            for name in SECTION_MAPS:
+                old_map = before.get(name) or {}
+                new_map = after.get(name) or {}
+                if old_map == new_map:
+                    continue
+                changes[name] = {
+                    key: {"from": old_map.get(key), "to": new_map.get(key)}
+                    for key in [*new_map, *(k for k in old_map if k not in new_map)]
+                    if old_map.get(key) != new_map.get(key)
+                }
+            if before.get("section_name") != after.get("section_name"):
+                changes["section_name"] = {"from": before.get("section_name"), "to": after.get("section_name")}
+
+            sections.append({
+                "section_number": number,
+                "section_name": after.get("section_name"),
+                "status": "modified",
+                "changes": changes,
+            })
+
+        return {"brief": brief_changes, "sections": sections}
+
+    def reconstruct(self, checkpoint: Dict[str, Any], deltas: List[Dict[str, List]]) -> Dict[str, Any]:
+        """Replay deltas, oldest first, on top of a checkpoint snapshot"""
+        flat = flatten(checkpoint)
+        for delta in deltas:
+            apply_delta(flat, delta)
+        return copy.deepcopy(unflatten(flat))
+
+
+version_service = VersionService()
@@ -1,10 +1,11 @@
 import apiClient from './client'
 
 export const briefsAPI = {
-  // Get all briefs
-  getAll(status = null, skip = 0, limit = 100) {
-    const params = { skip, limit }
+  // Get a page of briefs; pass the previous page's next_cursor to continue
+  getAll(status = null, cursor = null, limit = 100) {
+    const params = { limit }
     if (status) params.status = status
+    if (cursor) params.cursor = cursor
     return apiClient.get('/briefs', { params })
   },
 
@@ -13,6 +14,11 @@ export const briefsAPI = {
     return apiClient.get(`/briefs/${id}`)
   },
 
+  // Get a brief with its sections, document metadata and latest version in one request
+  getFull(id) {
+    return apiClient.get(`/briefs/${id}/full`)
+  },
+
   // Create brief
   create(data) {
     return apiClient.post('/briefs/', data)
@@ -19,7 +19,7 @@ export const useBriefStore = defineStore('brief', {
       this.error = null
       try {
         const response = await briefsAPI.getAll(status)
-        this.briefs = response.data
+        this.briefs = response.data.items
       } catch (error) {
         this.error = error.message
         console.error('Error fetching briefs:', error)
@@ -32,12 +32,11 @@ export const useBriefStore = defineStore('brief', {
       this.loading = true
       this.error = null
       try {
-        const response = await briefsAPI.getOne(id)
-        this.currentBrief = response.data
-        
-        // Also fetch sections and documents
-        await this.fetchSections(id)
-        await this.fetchDocuments(id)
+        // Brief, sections and documents in one round trip
+        const { sections, documents, ...brief } = (await briefsAPI.getFull(id)).data
+        this.currentBrief = brief
+        this.currentSections = sections
+        this.currentDocuments = documents
       } catch (error) {
         this.error = error.message
         console.error('Error fetching brief:', error)
@@ -0,0 +1,81 @@
+"""
+Requests per second on GET /api/briefs and PUT /api/sections/{id}.
+
+Runs against a live server, so the same script measures any build: start
+the current backend, run this, then check out the commit before the async
+port (sync engine, `def` routes), start it on the same database and run
+it again.
+
+Usage:
+    python scripts/bench_api_rps.py --base-url http://localhost:8001 \
+        [--concurrency 64] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def drive(client, concurrency, total, make_request):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        brief = (await client.post("/api/briefs/", json={"title": "RPS benchmark"})).json()
+        sections = (await client.get(f"/api/sections/brief/{brief['id']}")).json()
+        section_ids = [s["id"] for s in sections]
+
+        cases = {
+            "GET /api/briefs": lambda c, i: c.get("/api/briefs/", params={"limit": 20}),
+            "PUT /api/sections/{id}": lambda c, i: c.put(
+                f"/api/sections/{section_ids[i % len(section_ids)]}",
+                json={"content": {"Project Name": f"edit {i}"}},
+            ),
+        }
+
+        print(f"{args.base_url}: {args.requests} requests per case, concurrency {args.concurrency}")
+        for name, make_request in cases.items():
+            await drive(client, args.concurrency, min(args.requests, 100), make_request)  # warm-up
+            result = await drive(client, args.concurrency, args.requests, make_request)
+            print(
+                f"{name:26} {result['rps']:8.1f} req/s   p50 {result['p50_ms']:7.1f} ms"
+                f"   p99 {result['p99_ms']:7.1f} ms   errors {result['errors']}"
+            )
+
+        await client.delete(f"/api/briefs/{brief['id']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""
+Cache invalidation cost: KEYS + DEL against a namespace generation bump.
+
+Fills a Redis database with --keys list-page entries, then invalidates
+them both ways: the old clear_pattern() (KEYS briefs:list:* then DEL) and
+CacheService.clear_namespace() (one INCR). While each runs, a second
+client keeps issuing GETs, so the report also shows how long other
+requests were stalled. Uses --db on the given server and flushes it.
+
+Usage:
+    python scripts/bench_cache_invalidation.py --redis-url redis://localhost:6379 \
+        [--db 15] [--keys 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+import redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+SEED_BATCH = 10000
+
+
+def seed(client, keys, make_key):
+    for start in range(0, keys, SEED_BATCH):
+        pipe = client.pipeline(transaction=False)
+        for n in range(start, min(start + SEED_BATCH, keys)):
+            pipe.setex(make_key(n), 3600, '{"items": [], "next_cursor": null}')
+        pipe.execute()
+
+
+async def measure(probe, invalidate):
+    """Await `invalidate()` while `probe` issues GETs; returns (seconds, probe latencies)"""
+    latencies = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            started = time.perf_counter()
+            probe.get("briefs:probe")
+            latencies.append(time.perf_counter() - started)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    await invalidate()
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    poller.join()
+    return elapsed, sorted(latencies)
+
+
+async def clear_pattern(client):
+    keys = await client.keys("briefs:list:*")
+    if keys:
+        await client.delete(*keys)
+
+
+def report(name, elapsed, latencies):
+    print(
+        f"{name:28} {elapsed * 1000:9.2f} ms   concurrent GET p50 "
+        f"{statistics.median(latencies) * 1000:6.2f} ms   max {latencies[-1] * 1000:8.2f} ms"
+    )
+
+
+async def main(args):
+    os.environ["REDIS_URL"] = f"{args.redis_url.rstrip('/')}/{args.db}"
+    from services.cache_service import cache_service
+
+    # Seeding and flushing go through the sync client; both invalidations
+    # run on the async client the app uses
+    client = cache_service.sync_client
+    if client is None:
+        sys.exit(f"Cannot reach Redis at {os.environ['REDIS_URL']}")
+    probe = redis.from_url(os.environ["REDIS_URL"], decode_responses=True)
+    client.flushdb()
+
+    print(f"{args.keys} cached list pages")
+
+    seed(client, args.keys, lambda n: f"briefs:list:all:{n}:100")
+    report("KEYS + DEL (clear_pattern)", *await measure(
+        probe, lambda: clear_pattern(cache_service.redis_client)
+    ))
+
+    prefix = await cache_service.namespace_key("briefs:list", "")
+    seed(client, args.keys, lambda n: f"{prefix}all:{n}:100")
+    report("generation (clear_namespace)", *await measure(
+        probe, lambda: cache_service.clear_namespace("briefs:list")
+    ))
+
+    client.flushdb()
+    await cache_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--db", type=int, default=15)
+    parser.add_argument("--keys", type=int, default=100000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Editor traffic against a live server:
+
+- page load: brief + sections + documents as three requests against one
+  GET /briefs/{id}/full
+- revalidation: bytes transferred polling the brief, its sections and its
+  documents with and without If-None-Match
+- contention: --writers clients doing If-Match read-modify-write cycles
+  on one section; reports committed writes/s, 412 retries and whether
+  any write was lost
+
+Usage:
+    python scripts/bench_editor_api.py --base-url http://localhost:8001 \
+        [--requests 200] [--writers 16] [--writes 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def timed(make_requests, count):
+    timings = []
+    transferred = 0
+    for _ in range(count):
+        started = time.perf_counter()
+        responses = await make_requests()
+        timings.append(time.perf_counter() - started)
+        transferred += sum(len(r.content) for r in responses)
+    timings.sort()
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.99) - 1] * 1000, transferred / count
+
+
+async def page_load(client, brief_id, count):
+    async def three_calls():
+        return [
+            await client.get(f"/api/briefs/{brief_id}"),
+            await client.get(f"/api/sections/brief/{brief_id}"),
+            await client.get(f"/api/documents/brief/{brief_id}"),
+        ]
+
+    async def full():
+        return [await client.get(f"/api/briefs/{brief_id}/full")]
+
+    for name, make_requests in (("3 requests", three_calls), ("/full", full)):
+        p50, p99, size = await timed(make_requests, count)
+        print(f"page load {name:11} p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   {size / 1024:7.1f} KB")
+
+
+async def revalidation(client, brief_id, count):
+    urls = [f"/api/briefs/{brief_id}", f"/api/sections/brief/{brief_id}", f"/api/documents/brief/{brief_id}"]
+    etags = {url: (await client.get(url)).headers.get("ETag") for url in urls}
+
+    for name, conditional in (("plain", False), ("If-None-Match", True)):
+        transferred = 0
+        statuses = {}
+        started = time.perf_counter()
+        for _ in range(count):
+            for url in urls:
+                headers = {"If-None-Match": etags[url]} if conditional and etags[url] else {}
+                response = await client.get(url, headers=headers)
+                transferred += len(response.content)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+        print(f"polling {name:14} {transferred / 1024:9.1f} KB   {count * len(urls) / elapsed:7.1f} req/s   {statuses}")
+
+
+async def contention(client, brief_id, writers, writes):
+    section = (await client.get(f"/api/sections/brief/{brief_id}")).json()[0]
+    url = f"/api/sections/{section['id']}"
+    await client.put(url, json={"content": {}})
+    retries = 0
+
+    async def writer(w):
+        nonlocal retries
+        for n in range(writes):
+            while True:
+                current = (await client.get(f"/api/sections/brief/{brief_id}")).json()[0]
+                content = {**current["content"], f"writer {w} edit {n}": "x"}
+                response = await client.put(
+                    url, json={"content": content}, headers={"If-Match": f'"{current["row_version"]}"'}
+                )
+                if response.status_code != 412:
+                    response.raise_for_status()
+                    break
+                retries += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - started
+
+    final = (await client.get(f"/api/sections/brief/{brief_id}")).json()[0]["content"]
+    lost = writers * writes - len(final)
+    print(f"contention {writers} writers: {writers * writes / elapsed:6.1f} writes/s   "
+          f"{retries} retries (412)   {lost} lost writes")
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        brief = (await client.post("/api/briefs/", json={"title": "Editor benchmark"})).json()
+        await client.post(
+            "/api/documents/upload",
+            params={"brief_id": brief["id"]},
+            files={"file": ("notes.txt", b"benchmark notes", "text/plain")},
+        )
+
+        await page_load(client, brief["id"], args.requests)
+        await revalidation(client, brief["id"], args.requests)
+        await contention(client, brief["id"], args.writers, args.writes)
+
+        await client.delete(f"/api/briefs/{brief['id']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
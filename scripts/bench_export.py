@@ -0,0 +1,153 @@
+"""
+Export rendering benchmarks, on a throwaway SQLite database:
+
+- render time of a brief with every BRIEF_SCHEMA field filled, checked
+  against --budget-ms (the exit status is 1 when the PDF misses it)
+- PDF against DOCX throughput over --renders renders
+- time to first byte, total time and peak Python memory of GET
+  /briefs/{id}/export for a brief of about --pages pages
+- bulk ZIP export throughput of --bulk briefs on the process pool
+
+Usage:
+    python scripts/bench_export.py [--budget-ms 500] [--renders 50] [--pages 200] [--bulk 50]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+WORK_DIR = tempfile.mkdtemp(prefix="bench-export-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'export.db')}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+os.environ["EXPORT_CACHE_MAX_BYTES"] = "0"  # measure renders, not cache hits
+os.environ["EXPORT_JOB_DIR"] = os.path.join(WORK_DIR, "jobs")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from services.export_service import render_export  # noqa: E402
+from services.schema_service import schema_service  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)  # one INFO line per request otherwise
+
+PARAGRAPH = (
+    "The keynote stage needs a confirmed run of show, speaker briefings and "
+    "a fallback plan for the live demo, agreed with the venue two weeks out. "
+)
+
+
+def filled_content(paragraphs: int):
+    """Section number -> content with every schema field set"""
+    content = {}
+    for field in schema_service.fields:
+        content.setdefault(field["sectionNumber"], {})[field["inputName"]] = PARAGRAPH * paragraphs
+    return content
+
+
+async def create_brief(client, title, paragraphs):
+    brief = (await client.post("/api/briefs/", json={"title": title})).json()
+    sections = (await client.get(f"/api/sections/brief/{brief['id']}")).json()
+    content = filled_content(paragraphs)
+    for section in sections:
+        await client.put(
+            f"/api/sections/{section['id']}",
+            json={"content": content.get(section["section_number"], {})},
+        )
+    return brief
+
+
+async def export_data(brief_id):
+    from controllers.brief_controller import brief_controller
+    from database import AsyncSessionLocal
+    from models import Brief, BriefSection
+    from sqlalchemy import select
+
+    async with AsyncSessionLocal() as db:
+        brief = await db.get(Brief, brief_id)
+        result = await db.execute(
+            select(BriefSection).where(BriefSection.brief_id == brief_id).order_by(BriefSection.section_number)
+        )
+        return brief_controller._export_data(brief, result.scalars().all())
+
+
+def time_renders(data, format, count):
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        render_export(data, format)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=600
+    ) as client:
+        fields = len(schema_service.fields)
+
+        # Time budget for a fully filled brief
+        brief = await create_brief(client, "All fields", paragraphs=2)
+        data = await export_data(brief["id"])
+        render_export(data, "pdf")  # font metrics and templates warm up once per process
+        render_export(data, "word")
+        pdf = time_renders(data, "pdf", 10)
+        print(f"{fields}-field brief: PDF p50 {statistics.median(pdf) * 1000:.1f} ms "
+              f"(budget {args.budget_ms} ms), max {max(pdf) * 1000:.1f} ms")
+
+        # PDF against DOCX
+        for format in ("pdf", "word"):
+            started = time.perf_counter()
+            time_renders(data, format, args.renders)
+            elapsed = time.perf_counter() - started
+            print(f"{format:5} throughput: {args.renders / elapsed:6.1f} renders/s")
+
+        # Streaming a large export
+        # With every field filled, each paragraph per field adds about 1.7 pages
+        big = await create_brief(client, "Large brief", paragraphs=max(1, round(args.pages / 1.66)))
+        tracemalloc.start()
+        started = time.perf_counter()
+        first_byte = None
+        size = 0
+        async with client.stream("GET", f"/api/briefs/{big['id']}/export", params={"format": "pdf"}) as response:
+            async for chunk in response.aiter_bytes():
+                first_byte = first_byte or time.perf_counter() - started
+                size += len(chunk)
+        total = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"large export: {size / 1e6:.1f} MB, TTFB {first_byte * 1000:.0f} ms, "
+              f"total {total * 1000:.0f} ms, peak Python memory {peak / 1e6:.1f} MB")
+
+        # Bulk ZIP on the process pool
+        ids = [brief["id"]] + [
+            (await create_brief(client, f"Bulk {n}", paragraphs=2))["id"] for n in range(args.bulk - 1)
+        ]
+        started = time.perf_counter()
+        job = (await client.post("/api/briefs/export", json={"brief_ids": ids, "format": "pdf"})).json()
+        while job["status"] not in ("completed", "failed"):
+            await asyncio.sleep(0.1)
+            job = (await client.get(f"/api/briefs/export/jobs/{job['job_id']}")).json()
+        elapsed = time.perf_counter() - started
+        print(f"bulk export: {job['completed']} briefs in {elapsed:.2f}s "
+              f"({job['completed'] / elapsed:.1f} briefs/s, {job['status']})")
+
+    return statistics.median(pdf) * 1000 <= args.budget_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=500)
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--bulk", type=int, default=50)
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
@@ -0,0 +1,92 @@
+"""
+Spreadsheet extraction time and peak memory: the streaming, schema-driven
+extractor against the pandas read it replaced.
+
+Writes a workbook of roughly --mb megabytes: a header row with every
+BRIEF_SCHEMA field, one row of values, then filler rows. Each extractor
+then runs in a fresh process so its peak RSS is its own.
+
+Usage:
+    python scripts/bench_extraction.py [--mb 50] [--keep path.xlsx]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# Compressed size of one filler row (20 random 32-char cells), measured
+ROW_BYTES = 500
+FILLER_COLUMNS = 20
+
+
+def write_workbook(path: str, mb: int):
+    from openpyxl import Workbook
+    from services.schema_service import schema_service
+
+    names = [field["inputName"] for field in schema_service.fields]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Brief")
+    sheet.append(names)
+    sheet.append([f"value for {name}" for name in names])
+    for _ in range(mb * 1024 * 1024 // ROW_BYTES):
+        sheet.append([uuid.uuid4().hex for _ in range(FILLER_COLUMNS)])
+    workbook.save(path)
+
+
+def extract_streaming(path: str):
+    from services.document_service import extract_text_content
+    return extract_text_content(path, "xlsx")
+
+
+def extract_pandas(path: str):
+    import pandas as pd
+    df = pd.read_excel(path)
+    return {column: str(df.iloc[0][column]) for column in df.columns if isinstance(column, str)}
+
+
+def measure(method: str, path: str):
+    """Child process: run one extractor and report its time, peak RSS and field count"""
+    started = time.perf_counter()
+    fields = {"streaming": extract_streaming, "pandas": extract_pandas}[method](path)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(f"{elapsed:.3f} {peak_mb:.1f} {len(fields or {})}")
+
+
+def main(args):
+    path = args.keep or os.path.join(tempfile.mkdtemp(prefix="bench-extraction-"), "workbook.xlsx")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        write_workbook(path, args.mb)
+        print(f"Wrote {path} in {time.perf_counter() - started:.1f}s")
+    print(f"Workbook: {os.path.getsize(path) / 1e6:.1f} MB")
+
+    for method in ("streaming", "pandas"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", method, path],
+            check=True, capture_output=True, text=True,
+        ).stdout.split()
+        elapsed, peak_mb, fields = output[-3:]
+        print(f"{method:10} {float(elapsed):8.2f} s   peak RSS {float(peak_mb):8.1f} MB   {fields} fields")
+
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=50)
+    parser.add_argument("--keep", help="reuse (or create and keep) this workbook")
+    parser.add_argument("--measure", nargs=2, metavar=("METHOD", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(*args.measure)
+    else:
+        main(args)
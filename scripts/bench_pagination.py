@@ -0,0 +1,113 @@
+"""
+Brief listing latency by page depth: OFFSET pages against keyset cursors.
+
+Seeds --rows briefs into a throwaway SQLite database, then times one page
+of GET /api/briefs at increasing depths, both the old way (ORDER BY
+updated_at with OFFSET) and through get_all_briefs' (updated_at, id)
+cursor. The cache is off, so every page hits the database.
+
+Usage:
+    python scripts/bench_pagination.py [--rows 1000000] [--limit 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-pagination-"), "briefs.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import select  # noqa: E402
+
+from controllers.brief_controller import brief_controller  # noqa: E402
+from database import AsyncSessionLocal, engine, init_db  # noqa: E402
+from models import Brief  # noqa: E402
+from schemas import BriefResponse  # noqa: E402
+
+SEED_BATCH = 50000
+REPEAT = 5
+
+
+def seed(rows: int):
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(DB_PATH)
+    for offset in range(0, rows, SEED_BATCH):
+        conn.executemany(
+            "INSERT INTO briefs (id, title, status, created_at, updated_at, version, brief_metadata, row_version) "
+            "VALUES (?, ?, 'DRAFT', ?, ?, 1, '{}', 1)",
+            [
+                (str(uuid.uuid4()), f"Brief {n}", ts, ts)
+                for n in range(offset, min(offset + SEED_BATCH, rows))
+                for ts in [(start + timedelta(seconds=n)).isoformat(" ")]
+            ],
+        )
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def offset_page(db, depth: int, limit: int):
+    """The listing before cursors, serialized the same way as get_all_briefs"""
+    result = await db.execute(
+        select(Brief).order_by(Brief.updated_at.desc()).offset(depth).limit(limit)
+    )
+    return [BriefResponse.model_validate(b).model_dump(mode="json") for b in result.scalars().all()]
+
+
+async def timed(make_query) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await make_query(db)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def main(args):
+    await init_db()
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"Seeded {args.rows} briefs in {time.perf_counter() - started:.1f}s; page size {args.limit}")
+
+    depths = sorted({0, *(int(args.rows * f) // args.limit * args.limit for f in (0.01, 0.1, 0.5, 0.99))})
+
+    # The cursor of the last row before each depth
+    async with AsyncSessionLocal() as db:
+        cursors = {}
+        for depth in depths:
+            if depth:
+                result = await db.execute(
+                    select(Brief.updated_at, Brief.id)
+                    .order_by(Brief.updated_at.desc(), Brief.id.desc())
+                    .offset(depth - 1).limit(1)
+                )
+                cursors[depth] = brief_controller.encode_cursor(*result.one())
+
+    print(f"{'depth':>10} {'OFFSET':>12} {'cursor':>12}")
+    for depth in depths:
+        offset_ms = await timed(lambda db: offset_page(db, depth, args.limit))
+        cursor_ms = await timed(lambda db: brief_controller.get_all_briefs(
+            db, cursor=cursors.get(depth), limit=args.limit
+        ))
+        print(f"{depth:>10} {offset_ms:>9.2f} ms {cursor_ms:>9.2f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Version storage and reconstruction cost with delta versions.
+
+Creates one brief on a throwaway SQLite database, saves --versions versions
+of it with one field edited between saves, and reports the bytes stored
+against what full snapshots of the same versions would take, and how long
+GET /versions/{n} takes to rebuild a version from its checkpoint (cache off).
+
+Usage:
+    python scripts/bench_version_storage.py [--versions 1000] [--fields 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+WORK_DIR = tempfile.mkdtemp(prefix="bench-versions-")
+
+# Throwaway database, and no Redis so every read reconstructs from the rows
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'versions.db')}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import select, update  # noqa: E402
+
+from controllers.brief_controller import brief_controller  # noqa: E402
+from database import AsyncSessionLocal, engine, init_db  # noqa: E402
+from models import BriefSection, BriefVersion  # noqa: E402
+from schemas import BriefCreate  # noqa: E402
+from services.version_service import version_service  # noqa: E402
+
+
+def size(value) -> int:
+    return 0 if value is None else len(json.dumps(value))
+
+
+async def main(args):
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        brief = await brief_controller.create_brief(db, BriefCreate(title="Version benchmark"))
+        brief_id = brief.id
+        result = await db.execute(select(BriefSection.id).where(BriefSection.brief_id == brief_id))
+        section_ids = result.scalars().all()
+        for section_id in section_ids:
+            await db.execute(
+                update(BriefSection).where(BriefSection.id == section_id).values(content={
+                    f"field {n}": f"initial text for field {n} " * 4 for n in range(args.fields)
+                })
+            )
+        await db.commit()
+
+    started = time.perf_counter()
+    for n in range(args.versions):
+        async with AsyncSessionLocal() as db:
+            section_id = section_ids[n % len(section_ids)]
+            section = await db.get(BriefSection, section_id)
+            section.content = {**section.content, f"field {n % args.fields}": f"revision {n}"}
+            await db.commit()
+            await brief_controller.create_version(db, brief_id)
+    save_time = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(BriefVersion.version_number, BriefVersion.content_snapshot, BriefVersion.delta)
+            .where(BriefVersion.brief_id == brief_id)
+        )
+        rows = result.all()
+
+    stored = sum(size(snapshot) + size(delta) for _, snapshot, delta in rows)
+
+    full = 0
+    timings = []
+    for number, _, _ in rows:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            version = await brief_controller.get_version(db, brief_id, number)
+            timings.append(time.perf_counter() - started)
+        full += size(version["content_snapshot"])
+
+    timings.sort()
+    print(
+        f"{len(rows)} versions, {len(section_ids)} sections x {args.fields} fields, "
+        f"checkpoint every {version_service.checkpoint_interval}"
+    )
+    print(f"saving:          {save_time / args.versions * 1000:7.2f} ms per version")
+    print(f"full snapshots:  {full / 1e6:7.2f} MB")
+    print(f"delta storage:   {stored / 1e6:7.2f} MB ({stored / full:.1%} of full)")
+    print(
+        f"reconstruction:  p50 {statistics.median(timings) * 1000:6.2f} ms"
+        f"   p99 {timings[int(len(timings) * 0.99) - 1] * 1000:6.2f} ms"
+        f"   max {timings[-1] * 1000:6.2f} ms"
+    )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=1000)
+    parser.add_argument("--fields", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
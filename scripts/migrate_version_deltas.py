@@ -0,0 +1,74 @@
+"""
+Convert full-snapshot brief versions to delta storage.
+
+Rows written before delta storage hold a full snapshot and have no
+is_checkpoint flag. For every brief this keeps a snapshot on the first
+version and on every VERSION_CHECKPOINT_INTERVAL-th version, and rewrites
+the rest as field-level deltas against the version before them. Safe to
+re-run: only unflagged rows are touched.
+
+The NOT NULL constraint content_snapshot used to carry is dropped by the
+startup schema sync (init_db), which this script runs first.
+
+Usage:
+    python scripts/migrate_version_deltas.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", ".env"))
+
+from sqlalchemy import null, select, update  # noqa: E402
+
+from database import AsyncSessionLocal, engine, init_db  # noqa: E402
+from models import BriefVersion  # noqa: E402
+from services.version_service import version_service  # noqa: E402
+
+
+async def migrate():
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(BriefVersion.brief_id).where(BriefVersion.is_checkpoint.is_(None)).distinct()
+        )
+        brief_ids = result.scalars().all()
+
+    converted = 0
+    for brief_id in brief_ids:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BriefVersion.id, BriefVersion.version_number, BriefVersion.content_snapshot)
+                .where(BriefVersion.brief_id == brief_id, BriefVersion.is_checkpoint.is_(None))
+                .order_by(BriefVersion.version_number)
+            )
+            previous = None
+
+            for version_id, version_number, snapshot in result.all():
+                if version_service.is_checkpoint(version_number, previous is not None):
+                    values = {"is_checkpoint": True}
+                else:
+                    values = {
+                        "is_checkpoint": False,
+                        "delta": version_service.compute_delta(previous, snapshot),
+                        "content_snapshot": null(),
+                    }
+                    converted += 1
+
+                await db.execute(update(BriefVersion).where(BriefVersion.id == version_id).values(**values))
+                previous = snapshot
+
+            await db.commit()
+
+    await engine.dispose()
+    print(f"Migrated {len(brief_ids)} brief(s); {converted} version(s) now stored as deltas.")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+TEST_DIR = tempfile.mkdtemp(prefix="brief-tests-")
+DB_PATH = os.path.join(TEST_DIR, "tests.db")
+
+# The backend reads its configuration at import time. No Redis: tests that
+# need one get an in-memory fake through the `redis` fixture.
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def storage():
+    """Keep uploads and cached exports out of the working tree"""
+    from pathlib import Path
+    from services import document_service
+    from services.export_cache_service import export_cache_service
+    from services.bulk_export_service import bulk_export_service
+
+    uploads = Path(TEST_DIR, "uploads")
+    exports = Path(TEST_DIR, "exports")
+    jobs = Path(TEST_DIR, "jobs")
+    uploads.mkdir()
+    exports.mkdir()
+    jobs.mkdir()
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(document_service, "UPLOAD_DIR", uploads)
+        mp.setattr(export_cache_service, "cache_dir", str(exports))
+        mp.setattr(bulk_export_service, "job_dir", str(jobs))
+        yield
+
+
+@pytest.fixture
+def redis():
+    import fakeredis
+    from services.cache_service import cache_service
+
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    previous = cache_service.redis_client, cache_service.sync_client
+    cache_service.redis_client = client
+    cache_service.sync_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    yield client
+    cache_service.redis_client, cache_service.sync_client = previous
+
+
+@pytest.fixture
+def client(redis):
+    from fastapi.testclient import TestClient
+    import server
+
+    # Startup creates the schema; shutdown disposes the engine, so the
+    # next test (or event loop) starts with a fresh pool
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine on the app's event loop (the one the engine's connections live on)"""
+    return client.portal.call
+
+
+@pytest.fixture
+def new_brief(client):
+    def create(title="Test brief", **fields):
+        response = client.post("/api/briefs/", json={"title": title, **fields})
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
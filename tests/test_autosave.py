@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from services.autosave_service import autosave_service
+
+
+@pytest.fixture
+def autosave(client, monkeypatch):
+    monkeypatch.setattr(autosave_service, "requested", True)
+    return autosave_service
+
+
+def stored_content(run, section_id):
+    from database import AsyncSessionLocal
+    from models import BriefSection
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return (await db.get(BriefSection, section_id)).content
+
+    return run(read)
+
+
+def test_overlapping_flushes_keep_the_latest_edit(client, autosave, new_brief, run, monkeypatch):
+    brief = new_brief("Overlap")
+    section_id = client.get(f"/api/sections/brief/{brief['id']}").json()[0]["id"]
+    run(autosave.buffer, brief["id"], section_id, {"headline": "v1"})
+
+    write = autosave._write
+    second = {}
+
+    async def slow_write(raw):
+        if not second:
+            # Flush A has read v1; the user types v2 and flush B starts
+            # while A is still waiting on the database
+            await autosave.buffer(brief["id"], section_id, {"headline": "v2"})
+            second["flush"] = asyncio.create_task(autosave.flush_brief(brief["id"]))
+            await asyncio.sleep(0.3)
+        await write(raw)
+
+    monkeypatch.setattr(autosave, "_write", slow_write)
+
+    async def overlap():
+        await autosave.flush_brief(brief["id"])
+        await second["flush"]
+
+    run(overlap)
+
+    assert stored_content(run, section_id) == {"headline": "v2"}
+    assert run(autosave.pending, brief["id"]) == {}
+
+
+def test_buffered_edit_is_served_then_flushed(client, autosave, new_brief, run):
+    brief = new_brief("Buffered")
+    section_id = client.get(f"/api/sections/brief/{brief['id']}").json()[0]["id"]
+
+    response = client.put(f"/api/sections/{section_id}", json={"content": {"headline": "draft"}})
+    assert response.status_code == 200
+    assert stored_content(run, section_id) == {}
+
+    sections = client.get(f"/api/sections/brief/{brief['id']}").json()
+    assert sections[0]["content"] == {"headline": "draft"}
+    full = client.get(f"/api/briefs/{brief['id']}/full").json()
+    assert full["sections"][0]["content"] == {"headline": "draft"}
+
+    assert run(autosave.flush_brief, brief["id"]) == 1
+    assert stored_content(run, section_id) == {"headline": "draft"}
+    assert run(autosave.pending, brief["id"]) == {}
+    assert client.get(f"/api/sections/brief/{brief['id']}").json()[0]["content"] == {"headline": "draft"}
+
+
+def test_if_match_write_flushes_the_buffer_first(client, autosave, new_brief, run):
+    brief = new_brief("Conditional")
+    section = client.get(f"/api/sections/brief/{brief['id']}").json()[0]
+
+    client.put(f"/api/sections/{section['id']}", json={"content": {"headline": "buffered"}})
+
+    # The buffered edit moved the row on, so the old version no longer matches
+    response = client.put(
+        f"/api/sections/{section['id']}",
+        json={"content": {"headline": "stale"}},
+        headers={"If-Match": f'"{section["row_version"]}"'},
+    )
+    assert response.status_code == 412
+    assert stored_content(run, section["id"]) == {"headline": "buffered"}
@@ -0,0 +1,197 @@
+import pytest
+from sqlalchemy import event
+
+from services.cache_service import cache_service
+from services.schema_service import schema_service
+
+
+def test_cursor_pagination_walks_every_brief_once(client, new_brief):
+    created = {new_brief(f"Page {n}")["id"] for n in range(7)}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/briefs/", params=params).json()
+        assert len(page["items"]) <= 3
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    ids = [b["id"] for b in seen]
+    assert len(ids) == len(set(ids))
+    assert created <= set(ids)
+    keys = [(b["updated_at"], b["id"]) for b in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_malformed_cursor_and_status_are_rejected(client):
+    assert client.get("/api/briefs/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/briefs/", params={"status": "shipped"}).status_code == 400
+
+
+def test_brief_reads_through_the_cache_and_writes_invalidate_it(client, new_brief, run):
+    brief = new_brief("Cached")
+    assert client.get(f"/api/briefs/{brief['id']}").json()["title"] == "Cached"
+    assert run(cache_service.get, f"briefs:{brief['id']}")["title"] == "Cached"
+
+    client.put(f"/api/briefs/{brief['id']}", json={"title": "Renamed"})
+    assert run(cache_service.get, f"briefs:{brief['id']}") is None
+    assert client.get(f"/api/briefs/{brief['id']}").json()["title"] == "Renamed"
+
+
+def test_listing_is_invalidated_by_writes(client, new_brief):
+    first = client.get("/api/briefs/", params={"limit": 500}).json()
+    brief = new_brief("Listed")
+    second = client.get("/api/briefs/", params={"limit": 500}).json()
+
+    assert brief["id"] not in {b["id"] for b in first["items"]}
+    assert second["items"][0]["id"] == brief["id"]
+
+
+def test_if_match_rejects_stale_brief_writes(client, new_brief):
+    brief = new_brief("Guarded")
+    etag = client.get(f"/api/briefs/{brief['id']}").headers["ETag"]
+
+    response = client.put(f"/api/briefs/{brief['id']}", json={"title": "First"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    response = client.put(f"/api/briefs/{brief['id']}", json={"title": "Second"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/api/briefs/{brief['id']}").json()["title"] == "First"
+
+
+def test_if_match_rejects_stale_section_writes(client, new_brief):
+    brief = new_brief("Guarded sections")
+    section = client.get(f"/api/sections/brief/{brief['id']}").json()[0]
+    etag = f'"{section["row_version"]}"'
+
+    url = f"/api/sections/{section['id']}"
+    assert client.put(url, json={"content": {"a": "1"}}, headers={"If-Match": etag}).status_code == 200
+    assert client.put(url, json={"content": {"a": "2"}}, headers={"If-Match": etag}).status_code == 412
+
+
+def test_conditional_gets_return_304_until_something_changes(client, new_brief):
+    brief = new_brief("Conditional")
+    section_id = client.get(f"/api/sections/brief/{brief['id']}").json()[0]["id"]
+
+    urls = [
+        f"/api/briefs/{brief['id']}",
+        f"/api/sections/brief/{brief['id']}",
+        f"/api/documents/brief/{brief['id']}",
+        "/api/schema",
+    ]
+    etags = {}
+    for url in urls:
+        response = client.get(url)
+        etags[url] = response.headers["ETag"]
+        revalidated = client.get(url, headers={"If-None-Match": etags[url]})
+        assert revalidated.status_code == 304, url
+        assert revalidated.content == b""
+
+    client.put(f"/api/briefs/{brief['id']}", json={"title": "Changed"})
+    client.put(f"/api/sections/{section_id}", json={"content": {"a": "1"}})
+    client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief["id"]},
+        files={"file": ("notes.txt", b"conditional", "text/plain")},
+    )
+
+    for url in urls[:3]:
+        assert client.get(url, headers={"If-None-Match": etags[url]}).status_code == 200, url
+    assert client.get("/api/schema", headers={"If-None-Match": etags["/api/schema"]}).status_code == 304
+
+
+def test_full_payload_follows_every_write(client, new_brief):
+    brief = new_brief("Aggregate")
+    full = client.get(f"/api/briefs/{brief['id']}/full").json()
+    assert full["latest_version"] is None
+    assert [s["section_number"] for s in full["sections"]] == sorted(s["section_number"] for s in full["sections"])
+
+    client.put(f"/api/sections/{full['sections'][0]['id']}", json={"content": {"a": "1"}})
+    client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief["id"]},
+        files={"file": ("notes.txt", b"aggregate", "text/plain")},
+    )
+    client.post(f"/api/briefs/{brief['id']}/versions")
+    client.put(f"/api/briefs/{brief['id']}", json={"title": "Renamed"})
+
+    full = client.get(f"/api/briefs/{brief['id']}/full").json()
+    assert full["title"] == "Renamed"
+    assert full["sections"][0]["content"] == {"a": "1"}
+    assert [d["filename"] for d in full["documents"]] == ["notes.txt"]
+    assert "extracted_content" not in full["documents"][0]
+    assert full["latest_version"] is not None
+
+
+@pytest.fixture
+def section_inserts():
+    """INSERTs into brief_sections and commits while the test runs"""
+    from database import engine
+
+    seen = {"inserts": [], "commits": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO BRIEF_SECTIONS"):
+            seen["inserts"].append(executemany)
+
+    def on_commit(conn):
+        seen["commits"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.remove(engine.sync_engine, "commit", on_commit)
+
+
+def test_bulk_create_inserts_schema_sections_in_one_statement(client, section_inserts):
+    response = client.post("/api/briefs/bulk", json=[{"title": f"Bulk {n}"} for n in range(3)])
+
+    assert response.status_code == 201, response.text
+    briefs = response.json()
+    assert [b["title"] for b in briefs] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert section_inserts == {"inserts": [False], "commits": 1}
+
+    expected = [(s["sectionNumber"], s["sectionName"]) for s in schema_service.sections]
+    for brief in briefs:
+        sections = client.get(f"/api/sections/brief/{brief['id']}").json()
+        assert [(s["section_number"], s["section_name"]) for s in sections] == expected
+        assert all(s["content"] == {} and s["ai_generated"] == {} for s in sections)
+
+
+def test_large_bulk_create_is_chunked_but_commits_once(client, section_inserts, monkeypatch):
+    import controllers.section_controller as section_module
+
+    monkeypatch.setattr(section_module, "SECTION_INSERT_BATCH", 7)
+    count = 5
+    response = client.post("/api/briefs/bulk", json=[{"title": f"Chunked {n}"} for n in range(count)])
+
+    assert response.status_code == 201, response.text
+    rows = count * len(schema_service.sections)
+    assert len(section_inserts["inserts"]) == -(-rows // 7)
+    assert section_inserts["commits"] == 1
+
+
+def test_bulk_create_is_all_or_nothing(client, run, monkeypatch):
+    from sqlalchemy import func, select
+    from controllers.section_controller import section_controller
+    from database import AsyncSessionLocal
+    from models import Brief
+
+    async def fail(db, brief_ids):
+        raise RuntimeError("sections failed")
+
+    monkeypatch.setattr(section_controller, "initialize_sections", fail)
+
+    response = client.post("/api/briefs/bulk", json=[{"title": "Never stored"}, {"title": "Never stored"}])
+    assert response.status_code == 500
+
+    async def stored():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(func.count()).where(Brief.title == "Never stored"))
+
+    assert run(stored) == 0
@@ -0,0 +1,72 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services import bulk_export_service as bulk_module
+from services.bulk_export_service import BulkExportService, bulk_export_service
+
+
+@pytest.fixture
+def threaded_export(monkeypatch):
+    """Render in threads with a stub renderer instead of spawning processes"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(bulk_export_service, "_pool", lambda: pool)
+    monkeypatch.setattr(bulk_module, "render_export", lambda brief, format: f"{brief['title']}".encode())
+    yield
+    pool.shutdown()
+
+
+def wait_for(client, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/briefs/export/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Export job {job_id} did not finish")
+
+
+def test_any_worker_can_poll_and_download(client, new_brief, threaded_export, monkeypatch):
+    briefs = [new_brief(f"Bulk {n}") for n in range(3)]
+
+    response = client.post("/api/briefs/export", json={"brief_ids": [b["id"] for b in briefs], "format": "pdf"})
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    assert wait_for(client, job_id)["completed"] == 3
+
+    # Another worker: a fresh service sharing only Redis and the job directory
+    other = BulkExportService()
+    other.job_dir = bulk_export_service.job_dir
+    import routes.brief_routes as brief_routes
+    monkeypatch.setattr(brief_routes, "bulk_export_service", other)
+
+    assert client.get(f"/api/briefs/export/jobs/{job_id}").json()["status"] == "completed"
+
+    download = client.get(f"/api/briefs/export/jobs/{job_id}/download")
+    assert download.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        assert sorted(archive.namelist()) == sorted(f"brief_{b['id']}.pdf" for b in briefs)
+
+    # Downloaded once, then gone everywhere
+    assert client.get(f"/api/briefs/export/jobs/{job_id}/download").status_code == 404
+    monkeypatch.setattr(brief_routes, "bulk_export_service", bulk_export_service)
+    assert client.get(f"/api/briefs/export/jobs/{job_id}").status_code == 404
+
+
+def test_jobs_stay_in_process_without_redis(client, new_brief, threaded_export, monkeypatch):
+    from services.cache_service import cache_service
+
+    brief = new_brief("No Redis")
+    monkeypatch.setattr(cache_service, "redis_client", None)
+
+    response = client.post("/api/briefs/export", json={"brief_ids": [brief["id"]], "format": "word"})
+    job_id = response.json()["job_id"]
+    assert wait_for(client, job_id)["status"] == "completed"
+
+    download = client.get(f"/api/briefs/export/jobs/{job_id}/download")
+    assert download.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        assert archive.namelist() == [f"brief_{brief['id']}.docx"]
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from services import cache_service as cache_module
+from services.cache_service import CacheService, LocalCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_items=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_local_cache_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_items=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)  # capped at the L1 TTL
+
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+@pytest.fixture
+def make_worker(monkeypatch):
+    """CacheService instances sharing one fake Redis, like separate workers"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        cache_module.redis, "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+    )
+    monkeypatch.setattr(
+        cache_module.redis.asyncio, "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    workers = []
+
+    def make(l1=False):
+        monkeypatch.setenv("CACHE_L1_ENABLED", "true" if l1 else "false")
+        worker = CacheService()
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        if worker._listener is not None:
+            worker._listener.stop()
+
+
+def test_namespace_generation_invalidates_every_key(make_worker):
+    cache = make_worker()
+
+    async def scenario():
+        keys = [await cache.namespace_key("briefs:list", f"page:{n}") for n in range(100)]
+        for key in keys:
+            await cache.set(key, {"page": key})
+
+        await cache.clear_namespace("briefs:list")
+
+        for n in range(100):
+            assert await cache.namespace_key("briefs:list", f"page:{n}") not in keys
+        assert await cache.namespace_key("other", "page:0") == "other:g0:page:0"
+
+    asyncio.run(scenario())
+
+
+def test_writes_drop_other_workers_l1_entries(make_worker):
+    writer = make_worker(l1=True)
+    reader = make_worker(l1=True)
+    assert reader.local_cache is not None
+
+    async def scenario():
+        await writer.set("briefs:1", {"title": "old"})
+        assert await reader.get("briefs:1") == {"title": "old"}  # now held in the reader's L1
+
+        await writer.set("briefs:1", {"title": "new"})
+
+        deadline = time.time() + 5
+        while await reader.get("briefs:1") != {"title": "new"}:
+            assert time.time() < deadline, "reader kept serving its stale L1 entry"
+            await asyncio.sleep(0.05)
+
+        await writer.delete("briefs:1")
+        deadline = time.time() + 5
+        while await reader.get("briefs:1") is not None:
+            assert time.time() < deadline, "reader kept serving a deleted entry"
+            await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+
+def test_cache_is_a_no_op_without_redis(monkeypatch):
+    def refuse(url, **kwargs):
+        raise ConnectionError("no redis")
+
+    monkeypatch.setattr(cache_module.redis, "from_url", refuse)
+    cache = CacheService()
+
+    async def scenario():
+        await cache.set("a", 1)
+        await cache.clear_namespace("briefs:list")
+        assert await cache.get("a") is None
+        assert await cache.namespace_key("briefs:list", "x") == "briefs:list:g0:x"
+
+    asyncio.run(scenario())
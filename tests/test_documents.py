@@ -0,0 +1,142 @@
+import os
+
+from controllers.document_controller import document_controller
+from services import document_service as document_module
+from services.document_service import document_service
+
+
+def upload(client, brief_id, content=b"same bytes", filename="notes.txt"):
+    response = client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief_id},
+        files={"file": (filename, content, "text/plain")},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def stored_path(document):
+    return os.path.join(document_module.UPLOAD_DIR, f"{document['file_hash']}.{document['file_type']}")
+
+
+def stray_files():
+    return [name for name in os.listdir(document_module.UPLOAD_DIR) if name.startswith(".")]
+
+
+def test_same_bytes_are_stored_once(client, new_brief):
+    brief = new_brief("Dedup")
+    first = upload(client, brief["id"])
+    second = upload(client, brief["id"])
+
+    assert first["file_hash"] == second["file_hash"]
+    assert os.path.exists(stored_path(first))
+    assert stray_files() == []
+
+    client.delete(f"/api/documents/{first['id']}")
+    assert os.path.exists(stored_path(second))
+
+    client.delete(f"/api/documents/{second['id']}")
+    assert not os.path.exists(stored_path(second))
+    assert stray_files() == []
+
+
+def test_upload_over_the_limit_leaves_nothing_behind(client, new_brief, monkeypatch):
+    monkeypatch.setattr(document_module, "MAX_UPLOAD_SIZE", 10)
+    monkeypatch.setattr(document_module, "UPLOAD_CHUNK_SIZE", 4)
+    brief = new_brief("Too large")
+
+    response = client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief["id"]},
+        files={"file": ("big.txt", b"x" * 64, "text/plain")},
+    )
+    assert response.status_code == 413
+    assert stray_files() == []
+
+
+def post_streamed(run, brief_id, body, headers):
+    """POST through a transport that pulls the body as the app reads it"""
+    import httpx
+    import server
+
+    async def post():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/api/documents/upload", params={"brief_id": brief_id}, content=body(), headers=headers
+            )
+
+    return run(post)
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read(client, new_brief, run, monkeypatch):
+    monkeypatch.setattr(document_module, "MAX_UPLOAD_SIZE", 1024)
+    brief = new_brief("Declared too large")
+    sent = []
+
+    async def body():
+        for _ in range(64):
+            sent.append(1)
+            yield b"x" * 4096
+
+    response = post_streamed(run, brief["id"], body, {
+        "Content-Type": "multipart/form-data; boundary=b",
+        "Content-Length": str(64 * 4096),
+    })
+    assert response.status_code == 413
+    assert len(sent) < 64
+
+
+def test_chunked_upload_stops_at_the_limit(client, new_brief, run, monkeypatch):
+    monkeypatch.setattr(document_module, "MAX_UPLOAD_SIZE", 64 * 1024)
+    brief = new_brief("Streamed too large")
+    sent = []
+
+    async def body():
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="big.txt"\r\n\r\n'
+        for _ in range(256):
+            sent.append(1)
+            yield b"x" * 4096
+        yield b"\r\n--b--\r\n"
+
+    # No Content-Length: only the streaming check can catch it
+    response = post_streamed(run, brief["id"], body, {"Content-Type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    assert len(sent) < 256
+    assert stray_files() == []
+
+
+def test_upload_without_a_file_part_is_rejected(client, new_brief):
+    brief = new_brief("No file")
+    response = client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief["id"]},
+        data={"note": "no file here"},
+        files={"other": ("", b"")},
+    )
+    assert response.status_code == 400
+
+
+def test_delete_racing_an_upload_of_the_same_bytes_keeps_the_file(client, new_brief, monkeypatch):
+    from database import AsyncSessionLocal
+
+    brief = new_brief("Race")
+    existing = upload(client, brief["id"], b"raced bytes")
+
+    save_upload = document_service.save_upload
+
+    async def save_then_delete(upload_file, filename):
+        saved = await save_upload(upload_file, filename)
+        assert saved.deduplicated
+        # The last other reference goes before this upload's row is committed
+        async with AsyncSessionLocal() as db:
+            await document_controller.delete_document(db, existing["id"])
+        return saved
+
+    monkeypatch.setattr(document_service, "save_upload", save_then_delete)
+    document = upload(client, brief["id"], b"raced bytes")
+
+    assert document["file_hash"] == existing["file_hash"]
+    with open(stored_path(document), "rb") as f:
+        assert f.read() == b"raced bytes"
+    assert stray_files() == []
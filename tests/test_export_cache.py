@@ -0,0 +1,88 @@
+import io
+import os
+import time
+
+from services import export_cache_service as export_cache_module
+from services.export_cache_service import export_cache_service
+from services.export_service import export_service
+
+
+def cached_files(brief_id):
+    return sorted(name for name in os.listdir(export_cache_service.cache_dir) if name.startswith(f"{brief_id}_"))
+
+
+def count_renders(monkeypatch):
+    renders = []
+    render = export_service.export_to_pdf
+
+    def counted(brief_data):
+        renders.append(brief_data["id"])
+        return render(brief_data)
+
+    monkeypatch.setattr(export_service, "export_to_pdf", counted)
+    return renders
+
+
+def test_unchanged_brief_is_served_from_the_cache(client, new_brief, monkeypatch):
+    renders = count_renders(monkeypatch)
+    brief = new_brief("Cached export")
+
+    first = client.get(f"/api/briefs/{brief['id']}/export", params={"format": "pdf"})
+    second = client.get(f"/api/briefs/{brief['id']}/export", params={"format": "pdf"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert renders == [brief["id"]]
+    assert len(cached_files(brief["id"])) == 1
+
+
+def test_an_edit_renders_again_and_drops_the_old_export(client, new_brief, monkeypatch):
+    renders = count_renders(monkeypatch)
+    brief = new_brief("Edited export")
+    section = client.get(f"/api/sections/brief/{brief['id']}").json()[0]
+
+    client.get(f"/api/briefs/{brief['id']}/export", params={"format": "pdf"})
+    before = cached_files(brief["id"])
+
+    client.put(f"/api/sections/{section['id']}", json={"content": {"headline": "changed"}})
+    client.get(f"/api/briefs/{brief['id']}/export", params={"format": "pdf"})
+
+    assert len(renders) == 2
+    after = cached_files(brief["id"])
+    assert len(after) == 1 and after != before
+
+
+def test_newer_render_leaves_an_older_one_in_flight_alone(monkeypatch):
+    copy = export_cache_module.shutil.copyfileobj
+    raced = []
+
+    def copy_then_race(source, target):
+        copy(source, target)
+        if not raced:
+            # Render A is still on its temp file when render B lands
+            raced.append(True)
+            export_cache_service.put("race", "newer", "pdf", io.BytesIO(b"B"))
+
+    monkeypatch.setattr(export_cache_module.shutil, "copyfileobj", copy_then_race)
+
+    path = export_cache_service.put("race", "older", "pdf", io.BytesIO(b"A"))
+
+    with open(path, "rb") as f:
+        assert f.read() == b"A"
+    assert not any(name.endswith(".part") for name in os.listdir(export_cache_service.cache_dir))
+
+
+def test_temp_files_left_by_a_crash_are_cleaned_up():
+    leftover = os.path.join(export_cache_service.cache_dir, "crashed_f.pdf.0.part")
+    in_flight = os.path.join(export_cache_service.cache_dir, "crashed_g.pdf.1.part")
+    for path in (leftover, in_flight):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+    stale = time.time() - export_cache_module.STALE_PART_AGE - 60
+    os.utime(leftover, (stale, stale))
+
+    export_cache_service.put("crashed", "h", "pdf", io.BytesIO(b"done"))
+
+    assert not os.path.exists(leftover)
+    assert os.path.exists(in_flight)
+    os.remove(in_flight)
@@ -0,0 +1,53 @@
+import json
+import threading
+
+import pytest
+
+from services.export_service import build_layout, export_service, wrap_text
+
+
+def render_in_time(brief_data, timeout=10):
+    result = {}
+
+    def render():
+        result["pdf"] = export_service.export_to_pdf(brief_data).read()
+
+    worker = threading.Thread(target=render, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert not worker.is_alive(), "PDF render did not finish"
+    return result["pdf"]
+
+
+def brief_with(content):
+    return {"id": "b1", "title": "Brief", "sections": [
+        {"section_number": 1, "section_name": "Project Overview", "content": content},
+    ]}
+
+
+def test_wrap_text_keeps_lines_within_width():
+    lines = wrap_text("lorem ipsum dolor sit amet " * 20, "Helvetica", 10, 120)
+    assert len(lines) > 1
+    assert all(len(line) < 40 for line in lines)
+
+
+def test_wrap_text_splits_characters_wider_than_the_line():
+    lines = wrap_text("W Wide", "Helvetica", 10, 1)
+    assert "".join(lines) == "WWide"
+    assert all(len(line) == 1 for line in lines)
+
+
+def test_pdf_with_many_object_keys_renders():
+    row = {f"column {i}": f"value {i}" for i in range(45)}
+    pdf = render_in_time(brief_with({"Stakeholders": json.dumps([row, row])}))
+    assert pdf.startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("value", ["[{}]", "[{}, {}]", "{}"])
+def test_empty_objects_are_skipped(value):
+    assert build_layout(brief_with({"Stakeholders": value})).sections[0].groups == []
+    assert render_in_time(brief_with({"Stakeholders": value})).startswith(b"%PDF")
+
+
+def test_word_export_with_empty_table():
+    assert export_service.export_to_word(brief_with({"Stakeholders": "[{}]"})).read(2) == b"PK"
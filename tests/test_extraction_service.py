@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from services import extraction_service as extraction_module
+from services.extraction_service import extraction_service
+
+
+class StubExtractor:
+    """Stands in for extract_text_content; can hold a job until released"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result if result is not None else {"Project Name": "Stubbed"}
+        self.error = error
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, file_path, file_type):
+        self.calls.append(file_path)
+        self.started.set()
+        self.release.wait(10)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def extractor(client, monkeypatch):
+    """Run extractions in threads with a stub, instead of spawning processes"""
+    stub = StubExtractor()
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(extraction_module, "extract_text_content", stub)
+    monkeypatch.setattr(extraction_service, "_executor", pool)
+    monkeypatch.setattr(extraction_service, "_slots", asyncio.Semaphore(2))
+    yield stub
+    stub.release.set()
+    pool.shutdown()
+
+
+def add_document(run, brief_id, status="pending", started_at=None):
+    from database import AsyncSessionLocal
+    from models import Document
+
+    async def add():
+        async with AsyncSessionLocal() as db:
+            document = Document(
+                brief_id=brief_id, filename="brief.xlsx", file_path="brief.xlsx", file_type="xlsx",
+                extraction_status=status, extraction_started_at=started_at,
+            )
+            db.add(document)
+            await db.commit()
+            return document.id
+
+    return run(add)
+
+
+def document_row(run, document_id):
+    from database import AsyncSessionLocal
+    from models import Document
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return await db.get(Document, document_id)
+
+    return run(read)
+
+
+def extract(document_id):
+    return extraction_service._run(document_id, "brief.xlsx", "xlsx")
+
+
+def test_upload_returns_pending_and_completes_in_the_background(client, new_brief, extractor):
+    brief = new_brief("Upload")
+    extractor.release.clear()
+
+    buffer = BytesIO()
+    Workbook().save(buffer)
+    response = client.post(
+        "/api/documents/upload",
+        params={"brief_id": brief["id"]},
+        files={"file": ("brief.xlsx", buffer.getvalue(), "application/octet-stream")},
+    )
+    assert response.status_code == 201, response.text
+    document = response.json()
+    assert document["extraction_status"] == "pending"
+
+    extractor.release.set()
+    deadline = time.time() + 10
+    while document["extraction_status"] != "completed":
+        assert time.time() < deadline, f"extraction still {document['extraction_status']}"
+        time.sleep(0.05)
+        document = client.get(f"/api/documents/{document['id']}").json()
+    assert document["extracted_content"] == {"Project Name": "Stubbed"}
+
+
+def test_a_job_claimed_twice_runs_once(client, new_brief, run, extractor):
+    document_id = add_document(run, new_brief("Twice")["id"])
+    skipped = extraction_service.skipped
+
+    async def both():
+        await asyncio.gather(extract(document_id), extract(document_id))
+
+    run(both)
+
+    assert len(extractor.calls) == 1
+    assert extraction_service.skipped == skipped + 1
+    assert document_row(run, document_id).extraction_status == "completed"
+
+
+def test_a_live_claim_is_left_alone_and_a_lapsed_one_is_reclaimed(client, new_brief, run, extractor):
+    brief_id = new_brief("Claims")["id"]
+    now = datetime.utcnow()
+    live = add_document(run, brief_id, "processing", now)
+    lapsed = add_document(run, brief_id, "processing", now - extraction_service.claim_ttl - timedelta(minutes=1))
+
+    run(extract, live)
+    run(extract, lapsed)
+
+    assert len(extractor.calls) == 1
+    assert document_row(run, live).extraction_status == "processing"
+    assert document_row(run, lapsed).extraction_status == "completed"
+
+
+@pytest.mark.parametrize("error", [None, ValueError("corrupt workbook")])
+def test_the_outcome_is_dropped_once_another_worker_holds_the_claim(client, new_brief, run, extractor, error):
+    from sqlalchemy import update
+    from database import AsyncSessionLocal
+    from models import Document
+
+    document_id = add_document(run, new_brief("Taken over")["id"])
+    extractor.error = error
+    extractor.release.clear()
+    taken_at = datetime.utcnow() + timedelta(seconds=5)
+
+    async def lose_the_claim():
+        job = asyncio.create_task(extract(document_id))
+        while not extractor.started.is_set():
+            await asyncio.sleep(0.01)
+
+        # The claim lapsed and another worker took the job over
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Document).where(Document.id == document_id).values(extraction_started_at=taken_at)
+            )
+            await db.commit()
+
+        extractor.release.set()
+        await job
+
+    run(lose_the_claim)
+
+    document = document_row(run, document_id)
+    assert document.extraction_status == "processing"
+    assert document.extraction_started_at == taken_at
+    assert not document.extracted_content
+    assert document.extraction_error is None
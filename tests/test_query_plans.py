@@ -0,0 +1,173 @@
+"""
+Query plan regression tests for the controllers.
+
+Seeds the test database, drives every controller read/write path,
+captures the SQL each one issues and runs EXPLAIN QUERY PLAN on it. A
+statement that falls back to a full table scan fails its test.
+"""
+
+import asyncio
+import re
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SEED_BRIEFS = 200
+
+# "SCAN briefs" is a full table scan; "SCAN briefs USING INDEX ..." is an ordered index walk
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+LABELS = [
+    "get_all_briefs",
+    "get_all_briefs(cursor)",
+    "get_all_briefs(status)",
+    "get_brief",
+    "get_brief_state",
+    "get_brief_full",
+    "update_brief",
+    "get_brief_sections",
+    "get_sections_state",
+    "update_section",
+    "patch_sections",
+    "upload_document",
+    "find_extraction",
+    "get_brief_documents",
+    "get_documents_state",
+    "resume_pending",
+    "claim_extraction",
+    "delete_document",
+    "export_fingerprint",
+    "export_brief",
+    "export_briefs",
+    "create_version",
+    "create_version(delta)",
+    "get_versions",
+    "get_version",
+    "delete_brief",
+]
+
+
+async def submit_nothing(briefs, format):
+    return None
+
+
+async def exercise(captured):
+    from database import AsyncSessionLocal, engine, init_db
+    from models import BriefVersion, Document
+    from schemas import BriefCreate, BriefUpdate, SectionPatch
+    from controllers.brief_controller import brief_controller
+    from controllers.section_controller import section_controller
+    from controllers.document_controller import document_controller
+    from services.extraction_service import extraction_service
+
+    label = "seed"
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            # Batched statements share one plan
+            captured.setdefault(label, []).append((statement, parameters[0] if executemany else parameters))
+
+    async def run(name, coro):
+        nonlocal label
+        label = name
+        try:
+            return await coro
+        finally:
+            label = "seed"
+
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        brief_ids = []
+        for i in range(SEED_BRIEFS):
+            brief = await brief_controller.create_brief(db, BriefCreate(title=f"Brief {i}"))
+            db.add(Document(brief_id=brief.id, filename="a.xlsx", file_path="a.xlsx", file_type="xlsx",
+                            file_hash=f"{i:064x}", extraction_status="completed"))
+            # A little history on every brief, so the statistics don't hinge on
+            # whichever briefs other tests versioned heavily
+            db.add_all(BriefVersion(brief_id=brief.id, version_number=n, content_snapshot={})
+                       for n in (1, 2))
+            brief_ids.append(brief.id)
+        await db.commit()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        submitted = []
+
+        with pytest.MonkeyPatch.context() as mp:
+            # The statements matter here, not the background work
+            mp.setattr(extraction_service, "submit", lambda *job: submitted.append(job))
+            mp.setattr("services.bulk_export_service.bulk_export_service.submit", submit_nothing)
+
+            brief_id = brief_ids[SEED_BRIEFS // 2]
+            page = await run("get_all_briefs", brief_controller.get_all_briefs(db, limit=10))
+            await run("get_all_briefs(cursor)", brief_controller.get_all_briefs(db, cursor=page["next_cursor"], limit=10))
+            await run("get_all_briefs(status)", brief_controller.get_all_briefs(db, status="draft", limit=10))
+            await run("get_brief", brief_controller.get_brief(db, brief_id))
+            await run("get_brief_state", brief_controller.get_brief_state(db, brief_id))
+            await run("get_brief_full", brief_controller.get_brief_full(db, brief_id))
+            await run("update_brief", brief_controller.update_brief(db, brief_id, BriefUpdate(title="Renamed")))
+            sections = await run("get_brief_sections", section_controller.get_brief_sections(db, brief_id))
+            await run("get_sections_state", section_controller.get_sections_state(db, brief_id))
+            await run("update_section", section_controller.update_section(db, sections[0]["id"], {"content": {"a": "b"}}))
+            await run("patch_sections", section_controller.patch_sections(
+                db, brief_id, [SectionPatch(section_number=2, content={"a": "c"})]
+            ))
+
+            async def chunks():
+                yield b"not really a workbook"
+
+            document = await run("upload_document", document_controller.upload_document(db, brief_id, "rfp.xlsx", chunks()))
+            await run("find_extraction", document_controller._find_extraction(db, document.file_hash, "xlsx"))
+            await run("get_brief_documents", document_controller.get_brief_documents(db, brief_id))
+            await run("get_documents_state", document_controller.get_documents_state(db, brief_id))
+            await run("resume_pending", extraction_service.resume_pending())
+            await run("claim_extraction", extraction_service._set_status(
+                document.id, extraction_service._claimable(), status="processing"
+            ))
+            await run("delete_document", document_controller.delete_document(db, document.id))
+
+            await run("export_fingerprint", brief_controller.export_fingerprint(db, brief_id))
+            exported = await run("export_brief", brief_controller.export_brief(db, brief_id, "pdf"))
+            exported.close()
+            await run("export_briefs", brief_controller.export_briefs(db, brief_ids=brief_ids[:5]))
+
+            await run("create_version", brief_controller.create_version(db, brief_id))
+            await run("create_version(delta)", brief_controller.create_version(db, brief_id))
+            await run("get_versions", brief_controller.get_versions(db, brief_id))
+            await run("get_version", brief_controller.get_version(db, brief_id, 3))
+            await run("delete_brief", brief_controller.delete_brief(db, brief_id))
+
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plans():
+    captured = {}
+    asyncio.run(exercise(captured))
+
+    from database import DATABASE_URL
+
+    conn = sqlite3.connect(make_url(DATABASE_URL).database)
+    conn.execute("ANALYZE")
+    plans = {
+        label: [
+            (statement, [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+            for statement, parameters in statements
+        ]
+        for label, statements in captured.items()
+    }
+    conn.close()
+    return plans
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_query_uses_indexes(plans, label):
+    assert plans.get(label), f"{label} issued no statements"
+
+    for statement, details in plans[label]:
+        scans = [d for d in details if FULL_SCAN.match(d)]
+        assert not scans, f"{', '.join(scans)}\n  {' '.join(statement.split())}\n  plan: {' | '.join(details)}"
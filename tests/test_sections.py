@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements():
+    """Commits and UPDATE statements the engine runs while the test does"""
+    from database import engine
+
+    seen = {"commits": 0, "updates": 0}
+
+    def on_commit(conn):
+        seen["commits"] += 1
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE BRIEF_SECTIONS"):
+            seen["updates"] += 1
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    yield seen
+    event.remove(engine.sync_engine, "commit", on_commit)
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+def sections_of(client, brief_id):
+    return {s["section_number"]: s for s in client.get(f"/api/sections/brief/{brief_id}").json()}
+
+
+def patch(client, brief_id, *sections):
+    return client.patch(f"/api/briefs/{brief_id}/sections", json={"sections": list(sections)})
+
+
+def test_null_removes_a_key_and_other_keys_are_kept(client, new_brief):
+    brief = new_brief("Merge")
+    section = sections_of(client, brief["id"])[1]
+    client.put(f"/api/sections/{section['id']}", json={"content": {"a": "1", "b": "2"}})
+
+    response = patch(client, brief["id"], {"section_number": 1, "content": {"a": None, "c": "3"}})
+
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["content"] == {"b": "2", "c": "3"}
+    assert sections_of(client, brief["id"])[1]["content"] == {"b": "2", "c": "3"}
+
+
+def test_no_op_patch_returns_nothing_and_writes_nothing(client, new_brief, statements):
+    brief = new_brief("No-op")
+    section = sections_of(client, brief["id"])[1]
+    client.put(f"/api/sections/{section['id']}", json={"content": {"a": "1"}})
+    row_version = sections_of(client, brief["id"])[1]["row_version"]
+
+    statements.update(commits=0, updates=0)
+    response = patch(
+        client, brief["id"],
+        {"section_number": 1, "content": {"a": "1", "missing": None}},
+        {"section_number": 2, "ai_generated": {}},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+    assert statements == {"commits": 0, "updates": 0}
+    assert sections_of(client, brief["id"])[1]["row_version"] == row_version
+
+
+@pytest.mark.parametrize("content", [
+    {"Event Format": "Underwater"},
+    {"Event date": "next Tuesday"},
+])
+def test_invalid_dropdown_or_date_is_rejected(client, new_brief, content):
+    brief = new_brief("Invalid")
+
+    response = patch(client, brief["id"], {"section_number": 1, "content": content})
+
+    assert response.status_code == 422
+    assert list(response.json()["detail"]["errors"]) == [f"1.{next(iter(content))}"]
+    assert sections_of(client, brief["id"])[1]["content"] == {}
+
+
+def test_stale_row_version_is_rejected_and_nothing_is_written(client, new_brief):
+    brief = new_brief("Stale")
+    sections = sections_of(client, brief["id"])
+    client.put(f"/api/sections/{sections[2]['id']}", json={"content": {"a": "moved on"}})
+
+    response = patch(
+        client, brief["id"],
+        {"section_number": 1, "content": {"a": "1"}},
+        {"section_number": 2, "row_version": sections[2]["row_version"], "content": {"a": "2"}},
+    )
+
+    assert response.status_code == 412
+    after = sections_of(client, brief["id"])
+    assert after[1]["content"] == {}
+    assert after[2]["content"] == {"a": "moved on"}
+
+
+def test_several_sections_are_written_in_one_transaction(client, new_brief, statements):
+    brief = new_brief("Batch")
+    before = sections_of(client, brief["id"])
+
+    statements.update(commits=0, updates=0)
+    response = patch(
+        client, brief["id"],
+        {"section_number": 3, "content": {"c": "3"}},
+        {"section_id": before[1]["id"], "content": {"Event Format": "Hybrid"}},
+        {"section_number": 2, "ai_generated": {"b": True}},
+    )
+
+    assert response.status_code == 200, response.text
+    assert [s["section_number"] for s in response.json()] == [1, 2, 3]
+    assert statements == {"commits": 1, "updates": 3}
+
+    after = sections_of(client, brief["id"])
+    assert after[1]["content"] == {"Event Format": "Hybrid"}
+    assert after[2]["ai_generated"] == {"b": True}
+    assert after[3]["content"] == {"c": "3"}
+    assert all(after[n]["row_version"] == before[n]["row_version"] + 1 for n in (1, 2, 3))
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from services import document_service as document_module
+from services.document_service import _extract_fields, extract_text_content
+from services.schema_service import schema_service
+
+
+def workbook(path, *sheets):
+    """Write each sheet (a list of rows) to an .xlsx file"""
+    book = Workbook()
+    book.remove(book.active)
+    for n, rows in enumerate(sheets):
+        sheet = book.create_sheet(f"Sheet{n + 1}")
+        for row in rows:
+            sheet.append(row)
+    book.save(path)
+    return str(path)
+
+
+def test_header_row_layout_reads_the_first_non_empty_row(tmp_path):
+    path = workbook(tmp_path / "brief.xlsx", [
+        ["project name", "Event Format", "Internal notes", "Event Tier", "Event date"],
+        [None, None, None, None, None],
+        ["Summit 2025", "Hybrid", "ignored", 2.0, datetime(2025, 3, 14)],
+        ["Second row", "Virtual", "ignored", 3.0, datetime(2026, 1, 1)],
+    ])
+
+    assert extract_text_content(path, "xlsx") == {
+        "Project Name": "Summit 2025",
+        "Event Format": "Hybrid",
+        "Event Tier": "2",
+        "Event date": "2025-03-14",
+    }
+
+
+def test_key_value_layout_reads_the_second_column(tmp_path):
+    path = workbook(tmp_path / "brief.xlsx", [
+        ["Project Name", "  Summit 2025  "],
+        ["Something else", "ignored"],
+        ["EVENT-FORMAT", "Virtual"],
+        ["Venue", None],
+    ])
+
+    assert extract_text_content(path, "xlsx") == {
+        "Project Name": "Summit 2025",
+        "Event Format": "Virtual",
+    }
+
+
+def test_header_aliases_map_to_schema_fields(tmp_path):
+    path = workbook(tmp_path / "brief.xlsx", [
+        ["Event Name (English)", "Start Date", "Budget", "Landing City"],
+        ["Summit 2025", "2025-03-14", 125000, "Lisbon"],
+    ])
+
+    assert extract_text_content(path, "xlsx") == {
+        "Project Name": "Summit 2025",
+        "Event date": "2025-03-14",
+        "Forecasted Budget": "125000",
+        "City": "Lisbon",
+    }
+
+
+def test_fields_found_on_an_earlier_sheet_win(tmp_path):
+    path = workbook(
+        tmp_path / "brief.xlsx",
+        [["Project Name", "Summit 2025"]],
+        [["Project Name", "Venue"], ["Overwritten?", "Centre"]],
+    )
+
+    assert extract_text_content(path, "xlsx") == {"Project Name": "Summit 2025", "Venue": "Centre"}
+
+
+def rows_until(rows, consumed):
+    """Yield rows, failing the test if the extractor reads past them"""
+    for row in rows:
+        consumed.append(row)
+        yield row
+    raise AssertionError("read past the rows the extractor needed")
+
+
+def test_header_layout_skips_the_rest_of_the_sheet():
+    consumed = []
+    sheet = rows_until([["Project Name", "Venue"], ["Summit 2025", "Centre"]], consumed)
+
+    assert _extract_fields([sheet]) == {"Project Name": "Summit 2025", "Venue": "Centre"}
+    assert len(consumed) == 2
+
+
+def test_extraction_stops_once_every_field_is_found():
+    rows = [[field, f"value {n}"] for n, field in enumerate(sorted(set(schema_service.field_index.values())))]
+    consumed = []
+
+    def untouched():
+        raise AssertionError("opened a sheet after every field was found")
+        yield
+
+    extracted = _extract_fields([rows_until(rows, consumed), untouched()])
+
+    assert len(extracted) == len(rows) == len(consumed)
+
+
+def test_xls_goes_through_pandas(tmp_path, monkeypatch):
+    # No .xls writer is installed; pandas sniffs the content, so an .xlsx
+    # body still exercises the pandas path end to end
+    path = workbook(tmp_path / "legacy.xls", [
+        ["Project Name", "Event Tier"],
+        ["Summit 2025", 1],
+    ])
+
+    def no_openpyxl(*args, **kwargs):
+        raise AssertionError(".xls must not be opened with load_workbook")
+
+    monkeypatch.setattr(document_module, "load_workbook", no_openpyxl)
+
+    assert extract_text_content(path, "xls") == {"Project Name": "Summit 2025", "Event Tier": "1"}
+
+
+@pytest.mark.parametrize("file_type", ["csv", "pdf", "docx"])
+def test_other_types_are_not_extracted(tmp_path, file_type):
+    assert extract_text_content(str(tmp_path / f"notes.{file_type}"), file_type) is None
@@ -0,0 +1,141 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, inspect, text
+
+from services.version_service import version_service
+
+
+def test_versions_round_trip_through_deltas(client, new_brief, run, monkeypatch):
+    monkeypatch.setattr(version_service, "checkpoint_interval", 3)
+    brief = new_brief("Round trip")
+    sections = client.get(f"/api/sections/brief/{brief['id']}").json()
+
+    expected = {}
+    for n in range(1, 8):
+        response = client.put(
+            f"/api/sections/{sections[0]['id']}",
+            json={"content": {"headline": f"draft {n}"}},
+        )
+        assert response.status_code == 200, response.text
+        response = client.post(f"/api/briefs/{brief['id']}/versions")
+        assert response.status_code == 200, response.text
+        expected[response.json()["version_number"]] = f"draft {n}"
+
+    versions = client.get(f"/api/briefs/{brief['id']}/versions").json()
+    checkpoints = sorted(v["version_number"] for v in versions if v["is_checkpoint"])
+    assert checkpoints == [2, 3, 6]  # the first version, then every third
+
+    from services.cache_service import cache_service
+    run(cache_service.redis_client.flushall)  # force reconstruction from the rows
+
+    for number, headline in expected.items():
+        version = client.get(f"/api/briefs/{brief['id']}/versions/{number}").json()
+        assert version["content_snapshot"]["sections"][0]["content"] == {"headline": headline}
+
+
+def test_diff_lists_changed_fields_only(client, new_brief):
+    brief = new_brief("Diff")
+    sections = client.get(f"/api/sections/brief/{brief['id']}").json()
+
+    client.put(f"/api/sections/{sections[0]['id']}", json={"content": {"a": "1", "b": "2"}})
+    first = client.post(f"/api/briefs/{brief['id']}/versions").json()["version_number"]
+    client.put(f"/api/sections/{sections[0]['id']}", json={"content": {"a": "1", "b": "3"}})
+    second = client.post(f"/api/briefs/{brief['id']}/versions").json()["version_number"]
+
+    diff = client.get(
+        f"/api/briefs/{brief['id']}/versions/diff", params={"from": first, "to": second}
+    ).json()
+    assert diff["brief"] == {}
+    assert len(diff["sections"]) == 1
+    assert diff["sections"][0]["changes"] == {"content": {"b": {"from": "2", "to": "3"}}}
+
+
+def test_deleting_a_brief_drops_its_cached_versions(client, new_brief):
+    brief = new_brief("Deleted")
+    sections = client.get(f"/api/sections/brief/{brief['id']}").json()
+
+    client.put(f"/api/sections/{sections[0]['id']}", json={"content": {"a": "1"}})
+    first = client.post(f"/api/briefs/{brief['id']}/versions").json()["version_number"]
+    client.put(f"/api/sections/{sections[0]['id']}", json={"content": {"a": "2"}})
+    second = client.post(f"/api/briefs/{brief['id']}/versions").json()["version_number"]
+
+    version_url = f"/api/briefs/{brief['id']}/versions/{first}"
+    diff_url = f"/api/briefs/{brief['id']}/versions/diff"
+    diff_params = {"from": first, "to": second}
+    assert client.get(version_url).status_code == 200
+    assert client.get(diff_url, params=diff_params).status_code == 200
+
+    assert client.delete(f"/api/briefs/{brief['id']}").status_code == 204
+
+    assert client.get(version_url).status_code == 404
+    assert client.get(diff_url, params=diff_params).status_code == 404
+
+
+def test_concurrent_saves_get_consecutive_numbers(client, new_brief):
+    brief = new_brief("Hammered")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(
+            lambda _: client.post(f"/api/briefs/{brief['id']}/versions"), range(40)
+        ))
+
+    assert [r.status_code for r in responses] == [200] * 40
+    numbers = sorted(r.json()["version_number"] for r in responses)
+    assert numbers == list(range(numbers[0], numbers[0] + 40))
+
+    listed = client.get(f"/api/briefs/{brief['id']}/versions").json()
+    assert sorted(v["version_number"] for v in listed)[-40:] == numbers
+
+
+def test_counter_behind_stored_versions_catches_up(client, new_brief, run):
+    from sqlalchemy import update
+    from database import AsyncSessionLocal
+    from models import Brief
+
+    brief = new_brief("Behind")
+    for _ in range(3):
+        client.post(f"/api/briefs/{brief['id']}/versions")
+    latest = max(v["version_number"] for v in client.get(f"/api/briefs/{brief['id']}/versions").json())
+
+    async def rewind():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Brief).where(Brief.id == brief["id"]).values(version=1))
+            await db.commit()
+
+    run(rewind)
+
+    response = client.post(f"/api/briefs/{brief['id']}/versions")
+    assert response.status_code == 200, response.text
+    assert response.json()["version_number"] == latest + 1
+
+
+def test_schema_sync_relaxes_legacy_not_null_snapshot(tmp_path):
+    from database import sync_schema
+
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'legacy.db')}")
+    with engine.begin() as conn:
+        # brief_versions as created before delta storage
+        conn.execute(text(
+            "CREATE TABLE brief_versions ("
+            "id VARCHAR PRIMARY KEY, brief_id VARCHAR NOT NULL, version_number INTEGER NOT NULL, "
+            "content_snapshot JSON NOT NULL, created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO brief_versions VALUES ('v1', 'b1', 1, '{\"title\": \"Old\"}', NULL)"
+        ))
+
+    with engine.begin() as conn:
+        sync_schema(conn)
+
+    with engine.begin() as conn:
+        columns = {c["name"]: c for c in inspect(conn).get_columns("brief_versions")}
+        assert columns["content_snapshot"]["nullable"]
+        assert "delta" in columns and "is_checkpoint" in columns
+        indexes = {ix["name"] for ix in inspect(conn).get_indexes("brief_versions")}
+        assert "uq_brief_versions_brief_id_version_number" in indexes
+
+        assert conn.execute(text("SELECT content_snapshot FROM brief_versions")).scalar() == '{"title": "Old"}'
+        conn.execute(text("INSERT INTO brief_versions (id, brief_id, version_number) VALUES ('v2', 'b1', 2)"))
+
+    engine.dispose()